@@ -1,3 +1,15 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+import gzip
+from itertools import accumulate, count, islice
+import math
+import mmap
+from operator import add
+import os
+import random
+import struct
+
 # open screen
 HANGMAN_ASCII_ART = """Welcome to the game Hangman               
   _    _                                         
@@ -52,12 +64,185 @@ HANGMAN_PHOTOS = {1: '''    x-------x''',
 # global of tries
 num_of_tries = 1
 
+# word index file: magic, version, size and mtime of the words file, number of words, then the offsets
+WORD_INDEX_SUFFIX = ".idx"
+WORD_INDEX_HEADER = struct.Struct("<4sIQQQ")
+WORD_INDEX_MAGIC = b"HMWI"
+WORD_INDEX_VERSION = 1
+WORD_INDEX_CHUNK_SIZE = 1 << 24  # bytes of the words file read at once while building the index
+
+# difficulty file (built by hangman_difficulty.py): magic, version, size and mtime of the words file,
+# number of tiers, then where every tier starts and ends, then the records of the words sorted by tier
+DIFFICULTY_SUFFIX = ".difficulty"
+DIFFICULTY_HEADER = struct.Struct("<4sIQQI")
+DIFFICULTY_MAGIC = b"HMWD"
+DIFFICULTY_VERSION = 1
+DIFFICULTY_TIERS = ("easy", "medium", "hard")
+# word number in the words file, length, distinct letters, solver wrong guesses, letter rarity
+DIFFICULTY_RECORD = struct.Struct("<IHBBf")
+
 
 def print_hangman_open_screen():
     """print open screen"""
     print(HANGMAN_ASCII_ART, MAX_TRIES)
 
 
+def iter_word_offsets(file_path):
+    """
+    Yields the offsets of the words in a file of words separated by spaces, one chunk of the file at a time
+    :param file_path: path to file of words
+    :type file_path: str
+    :return: the starts of the words of every chunk, and the size of the file + 1 at the end
+    :rtype: generator of array
+    """
+    yield array("Q", [0])
+    start = 0  # where the word that goes on in the next chunk starts
+    rest = b""
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(WORD_INDEX_CHUNK_SIZE)
+            if not chunk:
+                break
+            words = (rest + chunk).split(b" ")
+            rest = words.pop()  # the last word may go on in the next chunk
+            # each next word starts after the words so far (from the start of the first) and a space after each
+            offsets = array("Q", map(add, accumulate(map(len, words)), count(start + 1)))
+            if offsets:
+                start = offsets[-1]
+            yield offsets
+    yield array("Q", [os.path.getsize(file_path) + 1])
+
+
+def build_word_index(file_path):
+    """
+    Builds the offsets of the words in a file of words separated by spaces in memory
+    :param file_path: path to file of words
+    :type file_path: str
+    :return: the start of every word, and the size of the file + 1 at the end
+    :rtype: array
+    """
+    offsets = array("Q")
+    for chunk_offsets in iter_word_offsets(file_path):
+        offsets.extend(chunk_offsets)
+    return offsets
+
+
+def write_word_index(file_path):
+    """
+    Builds the word index of a file of words and saves it next to the file (file_path + ".idx"),
+    the offsets of every chunk of the file are written as they are found
+    :param file_path: path to file of words
+    :type file_path: str
+    :return: path of the index file
+    :rtype: str
+    """
+    status = os.stat(file_path)
+    index_path = file_path + WORD_INDEX_SUFFIX
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    offsets = 0
+    with open(temp_path, "wb") as index_file:
+        index_file.write(bytes(WORD_INDEX_HEADER.size))  # the number of words is known only at the end
+        for chunk_offsets in iter_word_offsets(file_path):
+            chunk_offsets.tofile(index_file)
+            offsets += len(chunk_offsets)
+        index_file.seek(0)
+        index_file.write(WORD_INDEX_HEADER.pack(WORD_INDEX_MAGIC, WORD_INDEX_VERSION, status.st_size,
+                                                status.st_mtime_ns, offsets - 1))
+    os.replace(temp_path, index_path)  # other games see the whole index or none of it
+    return index_path
+
+
+def map_file(file_path):
+    """
+    Memory-maps a file for reading
+    :param file_path: path to the file
+    :type file_path: str
+    :return: the mapped file (empty bytes for an empty file, mmap can't map it)
+    :rtype: mmap.mmap
+    """
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class WordIndex:
+    """
+    Words of a file of words separated by spaces, by number, without reading the whole file.
+    The offsets of the words are saved once next to the file, and rebuilt when the file changes.
+    Both files are memory-mapped, so getting a word is O(1) in time and memory.
+    """
+
+    def __init__(self, file_path):
+        """
+        :param file_path: path to file of words
+        :type file_path: str
+        """
+        self.file_path = file_path
+        self._index = None
+        self._offsets = self._load_index()
+        if self._offsets is None:
+            try:
+                write_word_index(file_path)
+            except OSError:  # can't write next to the words, keep the index in memory
+                self._offsets = build_word_index(file_path)
+            else:
+                self._offsets = self._load_index()
+        self._words = map_file(file_path)
+
+    def _load_index(self):
+        """
+        Maps the saved index if it belongs to the current words file
+        :return: the offsets of the words, None if the index is missing or out of date
+        :rtype: memoryview
+        """
+        try:
+            index = map_file(self.file_path + WORD_INDEX_SUFFIX)
+        except FileNotFoundError:
+            return None
+        status = os.stat(self.file_path)
+        if len(index) >= WORD_INDEX_HEADER.size:
+            magic, version, size, mtime, words = WORD_INDEX_HEADER.unpack_from(index)
+            if ((magic, version, size, mtime) == (WORD_INDEX_MAGIC, WORD_INDEX_VERSION, status.st_size,
+                                                  status.st_mtime_ns)
+                    and len(index) == WORD_INDEX_HEADER.size + (words + 1) * 8):
+                self._index = index
+                return memoryview(index)[WORD_INDEX_HEADER.size:].cast("Q")
+        if isinstance(index, mmap.mmap):
+            index.close()
+        return None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def word(self, number):
+        """
+        Gets a word by its number
+        :param number: number of the word, from 0
+        :type number: int
+        :return: the word
+        :rtype: str
+        """
+        return self._words[self._offsets[number]:self._offsets[number + 1] - 1].decode()
+
+    def close(self):
+        """
+        Closes the memory-mapped files
+        :return: None
+        """
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        for mapped in (self._index, self._words):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 def choose_word(file_path, index):
     """
     Gets a file path and index and chooses a word based on it
@@ -67,10 +252,130 @@ def choose_word(file_path, index):
     :return: the letter guessed
     :rtype: string
     """
-    file_data = open(file_path, "r")
-    all_words = file_data.read().split(" ")
-    file_data.close()
-    return all_words[(index - 1) % len(all_words)]
+    with WordIndex(file_path) as words:
+        return words.word((index - 1) % len(words))
+
+
+def choose_word_by_difficulty(file_path, tier, index=None, rng=random):
+    """
+    Chooses a word of a difficulty tier, with the difficulty file built by hangman_difficulty.py
+    :param file_path: path to file of words
+    :param tier: "easy", "medium" or "hard"
+    :param index: num to choose a word of the tier (default is a random word)
+    :param rng: random numbers generator
+    :type file_path: str
+    :type tier: str
+    :type index: int
+    :type rng: random.Random
+    :return: the word, None if the tier has no words
+    :rtype: str
+    """
+    difficulty = map_file(file_path + DIFFICULTY_SUFFIX)
+    try:
+        status = os.stat(file_path)
+        magic, version, size, mtime, tiers = DIFFICULTY_HEADER.unpack_from(difficulty)
+        if (magic, version, size, mtime) != (DIFFICULTY_MAGIC, DIFFICULTY_VERSION, status.st_size, status.st_mtime_ns):
+            raise ValueError(f"{file_path + DIFFICULTY_SUFFIX} is out of date, run hangman_difficulty.py again")
+        tier_number = DIFFICULTY_TIERS.index(tier)
+        start, end = struct.unpack_from("<II", difficulty, DIFFICULTY_HEADER.size + tier_number * 4)
+        if start == end:
+            return None
+        number = (index - 1) % (end - start) if index is not None else rng.randrange(end - start)
+        records = DIFFICULTY_HEADER.size + (tiers + 1) * 4
+        word_number = DIFFICULTY_RECORD.unpack_from(difficulty, records + (start + number) * DIFFICULTY_RECORD.size)[0]
+    finally:
+        if isinstance(difficulty, mmap.mmap):
+            difficulty.close()
+    with WordIndex(file_path) as words:
+        return words.word(word_number)
+
+
+def iter_corpus_files(path):
+    """
+    Gets the files of a corpus, the file itself or all the files in a directory (recursively, sorted)
+    :param path: path to file or directory of words
+    :type path: str
+    :return: paths of the files
+    :rtype: generator
+    """
+    if not os.path.isdir(path):
+        yield path
+        return
+    for directory, directories, files in os.walk(path):
+        directories.sort()
+        for file_name in sorted(files):
+            if not file_name.endswith((WORD_INDEX_SUFFIX, DIFFICULTY_SUFFIX)):
+                yield os.path.join(directory, file_name)
+
+
+def iter_corpus_words(path):
+    """
+    Reads the words of a corpus in chunks, separated by spaces or new lines.
+    The corpus can be a file, a gzip file (.gz) or a directory of files
+    :param path: path to file or directory of words
+    :type path: str
+    :return: the words
+    :rtype: generator
+    """
+    for file_path in iter_corpus_files(path):
+        opener = gzip.open if file_path.endswith(".gz") else open
+        rest = b""
+        with opener(file_path, "rb") as file:
+            while True:
+                chunk = file.read(WORD_INDEX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                words = (rest + chunk).split()
+                # the last word may go on in the next chunk, unless the chunk ends with a space
+                rest = words.pop() if words and not chunk[-1:].isspace() else b""
+                for word in words:
+                    yield word.decode(errors="replace")
+        if rest:
+            yield rest.decode(errors="replace")
+
+
+def is_english_word(word):
+    """
+    Checks if a word can be played, English letters only (in any case)
+    :param word: the word
+    :type word: str
+    :return: True if it can be played
+    :rtype: boolean
+    """
+    return word.isascii() and word.isalpha()
+
+
+def sample_word(path, length=None, predicate=None, rng=random):
+    """
+    Chooses a uniformly random word of a corpus in one pass, without keeping the words in memory
+    (reservoir sampling with skips, so most words don't need a random number)
+    :param path: path to file, gzip file or directory of words
+    :param length: only words of this length
+    :param predicate: only words it returns True for
+    :param rng: random numbers generator
+    :type path: str
+    :type length: int
+    :type predicate: function
+    :type rng: random.Random
+    :return: the word, None if no word matches
+    :rtype: str
+    """
+    words = iter_corpus_words(path)
+    if length is not None:
+        words = (word for word in words if len(word) == length)
+    if predicate is not None:
+        words = filter(predicate, words)
+    chosen = next(words, None)
+    weight = 1 - rng.random()  # uniform in (0, 1], so the logs are defined
+    while chosen is not None:
+        # the number of words to skip until the next one that replaces the chosen word
+        skip = math.floor(math.log(1 - rng.random()) / math.log(1 - weight)) if weight < 1 else 0
+        chosen_next = next(islice(words, skip, None), None)
+        if chosen_next is None:
+            break
+        chosen = chosen_next
+        weight *= 1 - rng.random()
+    return chosen
 
 
 def print_hangman_photos(num):
@@ -93,13 +398,8 @@ def show_hidden_word(secret_word, old_letters_guessed):
     :return: the updated string, with all guessed letters
     :rtype: str
     """
-    result = ""
-    for i in secret_word:
-        if i in old_letters_guessed:
-            result = result + i + " "
-        else:
-            result = result + "_ "
-    return result[:-1]
+    old_letters_guessed = set(old_letters_guessed)
+    return " ".join(i if i in old_letters_guessed else "_" for i in secret_word)
 
 
 def check_valid_input(letter_guessed, old_letters_guessed):
@@ -166,33 +466,292 @@ def check_win(secret_word, old_letters_guessed):
     :return: True if the secret word was guessed, False if not
     :rtype: boolean
     """
-    for letter in secret_word:
-        if letter not in old_letters_guessed:
-            return False
-    return True
+    return set(secret_word).issubset(old_letters_guessed)
+
+
+ENGLISH_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# the result of HangmanGame.guess
+# status: "invalid" (not one English letter), "repeated" (guessed before), "correct" or "wrong"
+GuessResult = namedtuple("GuessResult", ["status", "hidden_word", "num_of_tries", "won", "lost"])
+
+
+@lru_cache(maxsize=1024)
+def letter_positions(secret_word):
+    """
+    Gets the positions of every English letter in a word (shared by the games of the same word)
+    :param secret_word: the word
+    :type secret_word: str
+    :return: the positions of each letter
+    :rtype: dict
+    """
+    positions = {}
+    for position, letter in enumerate(secret_word):
+        if letter in ENGLISH_LETTERS:
+            positions.setdefault(letter, []).append(position)
+    return {letter: tuple(letter_positions) for letter, letter_positions in positions.items()}
+
+
+class HangmanGame:
+    """
+    One game of hangman, without input and output, so many games can run in one process.
+    The guessed letters are a bitmask, and characters of the secret word that are not English letters are shown.
+    A guess only updates the positions of its letter in the shown word, and counts the letters left to guess,
+    so checking for a win doesn't scan the word (for long words and phrases)
+    """
+    __slots__ = ("secret_word", "num_of_tries", "_guessed", "_positions", "_shown", "_hidden_word", "_remaining")
+
+    def __init__(self, secret_word):
+        """
+        :param secret_word: the word to be guessed
+        :type secret_word: str
+        """
+        self.secret_word = secret_word.lower()
+        self.num_of_tries = 1  # the number of the HANGMAN_PHOTOS to show
+        self._guessed = 0
+        self._positions = letter_positions(self.secret_word)
+        self._shown = ["_" if letter in ENGLISH_LETTERS else letter for letter in self.secret_word]
+        self._hidden_word = " ".join(self._shown)
+        self._remaining = len(self._positions)  # different letters not guessed yet
+
+    @property
+    def old_letters_guessed(self):
+        """
+        The letters that were guessed, sorted
+        :rtype: list
+        """
+        return [letter for position, letter in enumerate(ENGLISH_LETTERS) if self._guessed >> position & 1]
+
+    @property
+    def hidden_word(self):
+        """
+        The secret word with '_' for letters that were not guessed yet, like show_hidden_word
+        :rtype: str
+        """
+        return self._hidden_word
+
+    @property
+    def won(self):
+        return self._remaining == 0
+
+    @property
+    def lost(self):
+        return self.num_of_tries == len(HANGMAN_PHOTOS)
+
+    def guess(self, letter_guessed):
+        """
+        Guesses a letter
+        :param letter_guessed: user’s input
+        :type letter_guessed: str
+        :return: the result of the guess
+        :rtype: GuessResult
+        """
+        letter_guessed = letter_guessed.lower()
+        position = ENGLISH_LETTERS.find(letter_guessed) if len(letter_guessed) == 1 else -1
+        if position < 0 or self.won or self.lost:
+            status = "invalid"
+        elif self._guessed >> position & 1:
+            status = "repeated"
+        else:
+            self._guessed |= 1 << position
+            if letter_guessed in self._positions:
+                status = "correct"
+                for letter_position in self._positions[letter_guessed]:
+                    self._shown[letter_position] = letter_guessed
+                self._hidden_word = " ".join(self._shown)
+                self._remaining -= 1
+            else:
+                status = "wrong"
+                self.num_of_tries += 1
+        return GuessResult(status, self.hidden_word, self.num_of_tries, self.won, self.lost)
+
+
+class EvilDictionary:
+    """
+    The words of one length for evil hangman, built once and shared by the games.
+    For every letter, the words are grouped by the bitmask of the letter's positions in the word (a hash table),
+    and every group is kept as a bitmask of word numbers, so a set of words is one int.
+    """
+
+    def __init__(self, words, length):
+        """
+        :param words: the words, only English words of the length are kept
+        :param length: the length of the words
+        :type words: iterable
+        :type length: int
+        """
+        self.length = length
+        self.words = sorted({word.lower() for word in words
+                             if len(word) == length and is_english_word(word)})
+        self.all_words = (1 << len(self.words)) - 1
+        groups = {letter: {} for letter in ENGLISH_LETTERS}
+        size = len(self.words) // 8 + 1
+        for number, word in enumerate(self.words):
+            masks = {}
+            for position, letter in enumerate(word):
+                masks[letter] = masks.get(letter, 0) | 1 << position
+            byte, bit = number >> 3, 1 << (number & 7)
+            for letter, mask in masks.items():
+                letter_groups = groups[letter]
+                if mask not in letter_groups:
+                    letter_groups[mask] = bytearray(size)
+                letter_groups[mask][byte] |= bit
+        # letter -> {positions bitmask: bitmask of the words with the letter in these positions}
+        self.families = {}
+        for letter, letter_groups in groups.items():
+            families = {mask: int.from_bytes(bits, "little") for mask, bits in letter_groups.items()}
+            with_letter = 0
+            for family in families.values():
+                with_letter |= family
+            families[0] = self.all_words & ~with_letter  # the words without the letter
+            self.families[letter] = families
+
+    @classmethod
+    def from_corpus(cls, path, length):
+        """
+        Reads the words of a length from a corpus (file, gzip file or directory of words)
+        :param path: path to the words
+        :param length: the length of the words
+        :type path: str
+        :type length: int
+        :return: the dictionary
+        :rtype: EvilDictionary
+        """
+        return cls(iter_corpus_words(path), length)
+
+
+class EvilHangmanGame(HangmanGame):
+    """
+    Evil hangman, the secret word is not chosen. After every guess the game keeps the largest family
+    of words that show the same positions of the letter (no positions first when families are equal).
+    The words that still match are a bitmask, so the size of a family is a popcount of an AND.
+    """
+    __slots__ = ("dictionary", "_candidates")
+
+    def __init__(self, dictionary):
+        """
+        :param dictionary: the words the secret word can be
+        :type dictionary: EvilDictionary
+        """
+        self.dictionary = dictionary
+        self._candidates = dictionary.all_words
+        self.secret_word = dictionary.words[0] if dictionary.words else ""  # one of the words that still match
+        self.num_of_tries = 1
+        self._guessed = 0
+        self._positions = {}
+        self._shown = ["_"] * dictionary.length
+        self._hidden_word = " ".join(self._shown)
+        self._remaining = dictionary.length  # positions not shown yet
+
+    def candidates(self):
+        """
+        The words that still match the shown word
+        :rtype: list
+        """
+        return [word for number, word in enumerate(self.dictionary.words) if self._candidates >> number & 1]
+
+    def guess(self, letter_guessed):
+        """
+        Guesses a letter, the game chooses the family of words that stays
+        :param letter_guessed: user’s input
+        :type letter_guessed: str
+        :return: the result of the guess
+        :rtype: GuessResult
+        """
+        letter_guessed = letter_guessed.lower()
+        position = ENGLISH_LETTERS.find(letter_guessed) if len(letter_guessed) == 1 else -1
+        if position < 0 or self.won or self.lost:
+            return GuessResult("invalid", self.hidden_word, self.num_of_tries, self.won, self.lost)
+        if self._guessed >> position & 1:
+            return GuessResult("repeated", self.hidden_word, self.num_of_tries, self.won, self.lost)
+        self._guessed |= 1 << position
+        best_size = -1
+        for mask, family in self.dictionary.families[letter_guessed].items():
+            size = (self._candidates & family).bit_count()
+            if size > best_size or size == best_size and mask == 0:
+                best_size, best_mask, best_family = size, mask, family
+        self._candidates &= best_family
+        if self._candidates:
+            self.secret_word = self.dictionary.words[(self._candidates & -self._candidates).bit_length() - 1]
+        if best_mask == 0:
+            self.num_of_tries += 1
+            return GuessResult("wrong", self.hidden_word, self.num_of_tries, self.won, self.lost)
+        for letter_position in range(self.dictionary.length):
+            if best_mask >> letter_position & 1:
+                self._shown[letter_position] = letter_guessed
+                self._remaining -= 1
+        self._hidden_word = " ".join(self._shown)
+        return GuessResult("correct", self.hidden_word, self.num_of_tries, self.won, self.lost)
+
+
+def print_hint(solver, secret_word, old_letters_guessed):
+    """
+    Prints the letter the solver would guess
+    :param solver: the solver of the words file
+    :param secret_word: the word to be guessed
+    :param old_letters_guessed: previous (valid) inputs
+    :type solver: hangman_solver.HangmanSolver
+    :type secret_word: str
+    :type old_letters_guessed: list
+    :return: None
+    """
+    letter = solver.best_letter(show_hidden_word(secret_word, old_letters_guessed), old_letters_guessed)
+    print(f"try: {letter}" if letter else "no hint")
 
 
 def main():
     print_hangman_open_screen()
     file_of_words = input("Please enter a path: ")
-    index_to_choose = input("Please enter a index: ")
-    secret_word = choose_word(file_of_words, int(index_to_choose))
-    old_letters_guessed = []  # all letter Already guessed
-    print_hangman_photos(1)
-    print(show_hidden_word(secret_word, old_letters_guessed))
+    index_to_choose = input("Please enter a index (empty for a random word, easy/medium/hard, or evil): ")
+    if index_to_choose == "evil":
+        secret_word = sample_word(file_of_words, predicate=is_english_word)
+    elif index_to_choose in DIFFICULTY_TIERS:
+        try:
+            secret_word = choose_word_by_difficulty(file_of_words, index_to_choose)
+        except (OSError, ValueError, struct.error):  # no difficulty file, or it is out of date or broken
+            secret_word = None
+        if secret_word is None:
+            print(f"No {index_to_choose} words, run hangman_difficulty.py {file_of_words}\n"
+                  "Choosing a random word instead")
+            secret_word = sample_word(file_of_words, predicate=is_english_word)
+    elif index_to_choose:
+        secret_word = choose_word(file_of_words, int(index_to_choose))
+    else:
+        secret_word = sample_word(file_of_words, predicate=is_english_word)
+    if secret_word is None:
+        print(f"No words of English letters in {file_of_words}")
+        return
+    if index_to_choose == "evil":  # only the length of the word is kept
+        game = EvilHangmanGame(EvilDictionary.from_corpus(file_of_words, len(secret_word)))
+    else:
+        game = HangmanGame(secret_word)
+    solver = None  # compiled on the first hint
+    print_hangman_photos(game.num_of_tries)
+    print(game.hidden_word)
     while True:
-        letter_guessed = input("Please enter a char: ")
-        if try_update_letter_guessed(letter_guessed, old_letters_guessed):
-            check_letter(letter_guessed, secret_word, old_letters_guessed)
+        letter_guessed = input("Please enter a char (? for a hint): ")
+        if letter_guessed == "?":
+            if solver is None:
+                from hangman_solver import HangmanSolver  # needs numpy, only for hints
+                solver = HangmanSolver.from_file(file_of_words)
+            print_hint(solver, game.secret_word, game.old_letters_guessed)
+            continue
+        result = game.guess(letter_guessed)
+        if result.status == "correct":
+            print("Excellent\n\n" + result.hidden_word)
+        elif result.status == "wrong":
+            print(":( \nooppps\n")
+            print_hangman_photos(result.num_of_tries)
+            print(result.hidden_word)
         else:
+            print("X \n" + (" -> ".join(game.old_letters_guessed) + "\ntry again"))
             continue
-        if check_win(secret_word, old_letters_guessed):
+        if result.won:
             print("WIN \nyou did a good job \nbye")
             break
-        elif num_of_tries == 7:  # if max of tries, game over
+        elif result.lost:  # if max of tries, game over
             print("LOSE \nGo have a coffee and try again")
             break
-    exit()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+"""
+Builds the difficulty file of a word list, for choosing words by difficulty in hangman.py.
+For every word it computes the length, the number of distinct letters, the rarity of its letters
+and the number of wrong guesses of the solver, in a process pool. The words are sorted into
+difficulty tiers and saved next to the word list (words.txt.difficulty), so choosing a word of a tier
+at game start is O(1).
+
+Example:
+    python hangman_difficulty.py words.txt
+"""
+import argparse
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+
+from hangman import (DIFFICULTY_HEADER, DIFFICULTY_MAGIC, DIFFICULTY_RECORD, DIFFICULTY_SUFFIX, DIFFICULTY_TIERS,
+                     DIFFICULTY_VERSION, ENGLISH_LETTERS, WordIndex, choose_word_by_difficulty)
+import hangman_eval
+
+# the solver of the worker process, set by _init_worker
+_solver = None
+
+
+def _init_worker(file_path):
+    """
+    Prepares the solver of a worker process once (it compiles the dictionary)
+    :param file_path: path to file of words
+    :type file_path: str
+    :return: None
+    """
+    global _solver
+    _solver = hangman_eval.make_strategy("solver", file_path)
+
+
+def is_playable(word):
+    """
+    Checks if a word can be played (English letters only)
+    :param word: the word
+    :type word: str
+    :return: True if it can be played
+    :rtype: boolean
+    """
+    return word.isascii() and word.isalpha()
+
+
+def letter_rarities(file_path):
+    """
+    Gets the rarity of every letter in the word list, in bits (-log2 of its share of all the letters)
+    :param file_path: path to file of words
+    :type file_path: str
+    :return: the rarity of each letter
+    :rtype: dict
+    """
+    counts = Counter()
+    with WordIndex(file_path) as words:
+        for number in range(len(words)):
+            word = words.word(number)
+            if is_playable(word):
+                counts.update(word.lower())
+    total = sum(counts.values())
+    return {letter: -math.log2(counts[letter] / total) if counts[letter] else 0.0 for letter in ENGLISH_LETTERS}
+
+
+def _word_features(file_path, start, end, rarities):
+    """
+    Computes the features of the words in a range of word numbers (runs in a worker process)
+    :param file_path: path to file of words
+    :param start: first word number
+    :param end: word number after the last
+    :param rarities: the rarity of each letter
+    :type file_path: str
+    :type start: int
+    :type end: int
+    :type rarities: dict
+    :return: (word number, length, distinct letters, solver wrong guesses, letter rarity) of the playable words
+    :rtype: list
+    """
+    features = []
+    with WordIndex(file_path) as words:
+        for number in range(start, end):
+            word = words.word(number)
+            if not is_playable(word):
+                continue
+            word = word.lower()
+            distinct = set(word)
+            _, misses = hangman_eval.play_word(word, _solver)
+            rarity = sum(rarities[letter] for letter in distinct) / len(distinct)
+            features.append((number, len(word), len(distinct), misses, rarity))
+    return features
+
+
+def build_difficulty(file_path, workers=None, chunk_size=1000):
+    """
+    Computes the features of all the words and saves the difficulty file next to the word list.
+    The words are sorted by the wrong guesses of the solver and then by letter rarity,
+    and split into tiers of the same size
+    :param file_path: path to file of words (separated by spaces, like choose_word)
+    :param workers: number of worker processes (default is the number of CPUs)
+    :param chunk_size: number of words sent to a worker at once
+    :type file_path: str
+    :type workers: int
+    :type chunk_size: int
+    :return: path of the difficulty file
+    :rtype: str
+    """
+    status = os.stat(file_path)
+    rarities = letter_rarities(file_path)
+    with WordIndex(file_path) as words:
+        total = len(words)
+    ranges = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(file_path,)) as executor:
+        futures = [executor.submit(_word_features, file_path, start, end, rarities) for start, end in ranges]
+        features = [feature for future in futures for feature in future.result()]
+    features.sort(key=lambda feature: (feature[3], feature[4]))
+    tiers = len(DIFFICULTY_TIERS)
+    tier_starts = array("I", (len(features) * tier // tiers for tier in range(tiers + 1)))
+    difficulty_path = file_path + DIFFICULTY_SUFFIX
+    temp_path = f"{difficulty_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as difficulty_file:
+        difficulty_file.write(DIFFICULTY_HEADER.pack(DIFFICULTY_MAGIC, DIFFICULTY_VERSION, status.st_size,
+                                                     status.st_mtime_ns, tiers))
+        tier_starts.tofile(difficulty_file)
+        for number, length, distinct, misses, rarity in features:
+            difficulty_file.write(DIFFICULTY_RECORD.pack(number, min(length, 0xFFFF), min(distinct, 0xFF), misses,
+                                                         rarity))
+    os.replace(temp_path, difficulty_path)
+    return difficulty_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the difficulty file of a hangman word list.")
+    parser.add_argument("path", help="file of words separated by spaces")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="words sent to a worker at once")
+    args = parser.parse_args()
+    print(f"saved {build_difficulty(args.path, args.workers, args.chunk_size)}")
+    for tier in DIFFICULTY_TIERS:
+        print(f"{tier}: {choose_word_by_difficulty(args.path, tier)}")
+
+
+if __name__ == '__main__':
+    main()
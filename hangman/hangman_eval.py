@@ -0,0 +1,197 @@
+"""
+Plays a hangman strategy against every word of a word list, in a process pool, to grade the words by difficulty.
+A game is lost like in hangman.py, when the last of the HANGMAN_PHOTOS is drawn (6 wrong guesses).
+The words are read and sent to the workers in chunks, and only the totals and the hardest words are kept,
+so the word list is never held in memory.
+
+Example:
+    python hangman_eval.py words.txt --strategy solver --hardest 20
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import heapq
+from itertools import islice
+import os
+
+from hangman import HANGMAN_PHOTOS, check_win, iter_corpus_words, show_hidden_word
+
+# letters of English from the most common, for the frequency strategy
+FREQUENCY_ORDER = "etaoinshrdlcumwfgypbvkjxqz"
+
+# the strategy of the worker process, set by _init_worker
+_strategy = None
+
+
+def frequency_strategy(hidden_word, old_letters_guessed):
+    """
+    Guesses the most common English letter that was not guessed yet
+    :param hidden_word: the output of show_hidden_word
+    :param old_letters_guessed: the letters that were guessed
+    :type hidden_word: str
+    :type old_letters_guessed: list
+    :return: the letter to guess
+    :rtype: str
+    """
+    for letter in FREQUENCY_ORDER:
+        if letter not in old_letters_guessed:
+            return letter
+    return None
+
+
+def play_word(secret_word, strategy):
+    """
+    Plays a game of hangman with a strategy
+    :param secret_word: the word to be guessed
+    :param strategy: gets the hidden word and the guessed letters and returns the next letter
+    :type secret_word: str
+    :type strategy: function
+    :return: True if the word was guessed, and the number of wrong guesses
+    :rtype: tuple
+    """
+    old_letters_guessed = []
+    num_of_tries = 1
+    while num_of_tries < len(HANGMAN_PHOTOS):
+        letter = strategy(show_hidden_word(secret_word, old_letters_guessed), old_letters_guessed)
+        if letter is None:
+            break
+        old_letters_guessed.append(letter)
+        if letter not in secret_word:
+            num_of_tries += 1
+        elif check_win(secret_word, old_letters_guessed):
+            return True, num_of_tries - 1
+    return False, num_of_tries - 1
+
+
+def make_strategy(strategy_name, dictionary_path):
+    """
+    Creates a strategy by its name (the solver compiles the dictionary)
+    :param strategy_name: "solver" or "frequency"
+    :param dictionary_path: the words the solver knows
+    :type strategy_name: str
+    :type dictionary_path: str
+    :return: function of (hidden word, letters guessed) that returns the next letter
+    :rtype: function
+    """
+    if strategy_name == "solver":
+        from hangman_solver import HangmanSolver
+        return HangmanSolver.from_file(dictionary_path).best_letter
+    return frequency_strategy
+
+
+def _init_worker(strategy_name, dictionary_path):
+    """
+    Prepares the strategy of a worker process once
+    :param strategy_name: "solver" or "frequency"
+    :param dictionary_path: the words the solver knows
+    :type strategy_name: str
+    :type dictionary_path: str
+    :return: None
+    """
+    global _strategy
+    _strategy = make_strategy(strategy_name, dictionary_path)
+
+
+def _play_chunk(words, hardest):
+    """
+    Plays all the words of a chunk (runs in a worker process)
+    :param words: the words
+    :param hardest: number of hardest words to keep
+    :type words: list
+    :type hardest: int
+    :return: number of games, wins, total wrong guesses, and the hardest words as (wrong guesses, lost, word)
+    :rtype: tuple
+    """
+    wins = 0
+    wrong_guesses = 0
+    results = []
+    for word in words:
+        won, misses = play_word(word, _strategy)
+        wins += won
+        wrong_guesses += misses
+        results.append((misses, not won, word))
+    return len(words), wins, wrong_guesses, heapq.nlargest(hardest, results)
+
+
+def iter_chunks(path, chunk_size):
+    """
+    Reads the words that can be played (English letters only, lower case) in chunks
+    :param path: path to file, gzip file or directory of words
+    :param chunk_size: number of words in a chunk
+    :type path: str
+    :type chunk_size: int
+    :return: lists of words
+    :rtype: generator
+    """
+    words = (word.lower() for word in iter_corpus_words(path) if word.isascii() and word.isalpha())
+    while True:
+        chunk = list(islice(words, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate(path, strategy_name="solver", dictionary_path=None, workers=None, chunk_size=1000, hardest=10):
+    """
+    Plays a strategy against every word of a word list in a process pool.
+    Only a few chunks wait for the workers at a time, and the results are merged as they come
+    :param path: path to the words to play (file, gzip file or directory)
+    :param strategy_name: "solver" or "frequency"
+    :param dictionary_path: the words the solver knows (default is the words to play)
+    :param workers: number of worker processes (default is the number of CPUs)
+    :param chunk_size: number of words sent to a worker at once
+    :param hardest: number of hardest words to report
+    :type path: str
+    :type strategy_name: str
+    :type dictionary_path: str
+    :type workers: int
+    :type chunk_size: int
+    :type hardest: int
+    :return: games, wins, win_rate, mean_wrong_guesses and hardest (list of (wrong guesses, lost, word))
+    :rtype: dict
+    """
+    workers = workers or os.cpu_count()
+    games = wins = wrong_guesses = 0
+    hardest_words = []
+    chunks = iter_chunks(path, chunk_size)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(strategy_name, dictionary_path or path)) as executor:
+        running = {executor.submit(_play_chunk, chunk, hardest) for chunk in islice(chunks, 2 * workers)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_games, chunk_wins, chunk_wrong_guesses, chunk_hardest = future.result()
+                games += chunk_games
+                wins += chunk_wins
+                wrong_guesses += chunk_wrong_guesses
+                hardest_words = heapq.nlargest(hardest, hardest_words + chunk_hardest)
+                for chunk in islice(chunks, 1):
+                    running.add(executor.submit(_play_chunk, chunk, hardest))
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "mean_wrong_guesses": wrong_guesses / games if games else 0.0,
+        "hardest": hardest_words,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a hangman strategy against every word of a word list.")
+    parser.add_argument("path", help="file, gzip file or directory of words")
+    parser.add_argument("--strategy", choices=("solver", "frequency"), default="solver")
+    parser.add_argument("--dictionary", help="the words the solver knows (default is the word list)")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="words sent to a worker at once")
+    parser.add_argument("--hardest", type=int, default=10, help="number of hardest words to print")
+    args = parser.parse_args()
+    results = evaluate(args.path, args.strategy, args.dictionary, args.workers, args.chunk_size, args.hardest)
+    print(f"games: {results['games']}")
+    print(f"win rate: {results['win_rate']:.2%}")
+    print(f"mean wrong guesses: {results['mean_wrong_guesses']:.3f}")
+    print("hardest words:")
+    for misses, lost, word in results["hardest"]:
+        print(f"{word: <20}{misses} wrong guesses{', lost' if lost else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Hangman solver, chooses the next letter to guess.
+The dictionary is compiled once into NumPy arrays (letters bitmask, length and letter codes of every word),
+so filtering the words that still match a hidden word is a vectorized mask over the whole dictionary.
+"""
+import numpy as np
+
+from hangman import iter_corpus_words
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+HIDDEN_LETTER = "_"
+
+
+def letter_code(letter):
+    """
+    Gets the code of a letter in the arrays of the solver
+    :param letter: English letter
+    :type letter: str
+    :return: 1 for "a" to 26 for "z" (0 is the padding after the end of a word)
+    :rtype: int
+    """
+    return LETTERS.index(letter.lower()) + 1
+
+
+def parse_hidden_word(hidden_word):
+    """
+    Gets the letters of the output of show_hidden_word
+    :param hidden_word: the shown word, like "_ a _"
+    :type hidden_word: str
+    :return: the letter in every position, "_" for letters that were not guessed yet
+    :rtype: list
+    """
+    return [letter.lower() for letter in hidden_word.split(" ")]
+
+
+class HangmanSolver:
+    """
+    Chooses the letter that gives the most information on the secret word,
+    from the words of the dictionary that match the hidden word and the guessed letters.
+    """
+
+    def __init__(self, words):
+        """
+        :param words: the dictionary, words that are not English letters only are skipped
+        :type words: iterable
+        """
+        words = sorted({word.lower() for word in words if word.isascii() and word.isalpha()}, key=len)
+        self.words = np.array(words, dtype=object)
+        self.lengths = np.fromiter(map(len, words), dtype=np.int32, count=len(words))
+        max_length = int(self.lengths.max()) if len(words) else 0
+        # letter codes of every word, 0 after the end of the word
+        self.codes = np.zeros((len(words), max_length), dtype=np.uint8)
+        buffer = np.frombuffer("".join(words).encode(), dtype=np.uint8) - ord("a") + 1
+        starts = np.concatenate(([0], np.cumsum(self.lengths)[:-1])) if len(words) else self.lengths
+        rows = np.repeat(np.arange(len(words)), self.lengths)
+        self.codes[rows, np.arange(len(buffer)) - np.repeat(starts, self.lengths)] = buffer
+        # bit i is set if letter i ("a" is 0) is in the word
+        self.masks = np.zeros(len(words), dtype=np.uint32)
+        for position in range(max_length):
+            column = self.codes[:, position]
+            self.masks |= np.where(column > 0, np.left_shift(np.uint32(1), column.astype(np.uint32) - 1), 0
+                                   ).astype(np.uint32)
+        # the words are sorted by length, so the words of each length are a slice
+        self.length_starts = np.searchsorted(self.lengths, np.arange(max_length + 2))
+        # the last filtered position of a game, the next guess only filters its candidates
+        self._last_letters = None
+        self._last_guessed = frozenset()
+        self._last_candidates = None
+        # letter counts of all the words of each length, for the first guess
+        self._length_counts = {}
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Compiles the words of a corpus (file, gzip file or directory of words)
+        :param path: path to the words
+        :type path: str
+        :return: the solver
+        :rtype: HangmanSolver
+        """
+        return cls(iter_corpus_words(path))
+
+    def candidates(self, hidden_word, old_letters_guessed):
+        """
+        Gets the words of the dictionary that can still be the secret word
+        :param hidden_word: the output of show_hidden_word
+        :param old_letters_guessed: the letters that were guessed
+        :type hidden_word: str
+        :type old_letters_guessed: list
+        :return: the indexes of the words in self.words
+        :rtype: numpy.ndarray
+        """
+        letters = parse_hidden_word(hidden_word)
+        guessed = frozenset(letter.lower() for letter in old_letters_guessed)
+        length = len(letters)
+        if length >= len(self.length_starts) - 1:
+            return np.arange(0)
+        if self._continues_last(letters, guessed):
+            candidates = self._last_candidates
+            codes = self.codes[candidates]
+            masks = self.masks[candidates]
+        else:
+            start, end = self.length_starts[length], self.length_starts[length + 1]
+            candidates = np.arange(start, end)
+            codes = self.codes[start:end]
+            masks = self.masks[start:end]
+        correct_letters = {letter for letter in letters if letter != HIDDEN_LETTER}
+        wrong_mask = 0
+        for letter in guessed:
+            if letter not in correct_letters and letter in LETTERS:
+                wrong_mask |= 1 << (letter_code(letter) - 1)
+        match = (masks & np.uint32(wrong_mask)) == 0
+        hidden_positions = [position for position, letter in enumerate(letters) if letter == HIDDEN_LETTER]
+        for position, letter in enumerate(letters):
+            if letter != HIDDEN_LETTER:
+                match &= codes[:, position] == letter_code(letter)
+        if correct_letters and hidden_positions:
+            # a guessed letter is shown in all its positions, so it is not in the hidden ones
+            correct_codes = [letter_code(letter) for letter in correct_letters]
+            match &= ~np.isin(codes[:, hidden_positions], correct_codes).any(axis=1)
+        candidates = candidates[match]
+        self._last_letters, self._last_guessed, self._last_candidates = letters, guessed, candidates
+        return candidates
+
+    def _continues_last(self, letters, guessed):
+        """
+        Checks if a position comes after the last filtered position (more guesses of the same word)
+        :param letters: the letters of the hidden word
+        :param guessed: the guessed letters
+        :type letters: list
+        :type guessed: frozenset
+        :return: True if the last candidates contain all the candidates of this position
+            (the same letters are shown, a letter guessed then is still guessed and a wrong letter is still wrong)
+        :rtype: boolean
+        """
+        if self._last_letters is None or len(letters) != len(self._last_letters) or not self._last_guessed <= guessed:
+            return False
+        if not all(last == HIDDEN_LETTER or last == letter for last, letter in zip(self._last_letters, letters)):
+            return False
+        # a letter that was wrong in the last position must not be shown now (another game)
+        wrong_letters = self._last_guessed - set(self._last_letters)
+        return not wrong_letters.intersection(letters)
+
+    def letter_counts(self, candidates):
+        """
+        Counts the candidates that contain each letter
+        :param candidates: indexes of words
+        :type candidates: numpy.ndarray
+        :return: 26 counts, from "a" to "z"
+        :rtype: numpy.ndarray
+        """
+        masks = self.masks[candidates].astype("<u4").view(np.uint8).reshape(-1, 4)
+        return np.unpackbits(masks, axis=1, bitorder="little")[:, :len(LETTERS)].sum(axis=0)
+
+    def best_letter(self, hidden_word, old_letters_guessed):
+        """
+        Chooses the next letter to guess, the letter that splits the candidates best (the most entropy),
+        and between equal letters the one that is in more candidates
+        :param hidden_word: the output of show_hidden_word
+        :param old_letters_guessed: the letters that were guessed
+        :type hidden_word: str
+        :type old_letters_guessed: list
+        :return: the letter, None if no word of the dictionary matches
+        :rtype: str
+        """
+        candidates = self.candidates(hidden_word, old_letters_guessed)
+        if len(candidates) == 0:
+            return None
+        if old_letters_guessed:
+            counts = self.letter_counts(candidates)
+        else:
+            length = len(hidden_word.split(" "))
+            if length not in self._length_counts:
+                self._length_counts[length] = self.letter_counts(candidates)
+            counts = self._length_counts[length]
+        probabilities = counts / len(candidates)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.nan_to_num(probabilities * np.log2(probabilities)
+                                     + (1 - probabilities) * np.log2(1 - probabilities))
+        scores = entropy + probabilities * 1e-6
+        for letter in old_letters_guessed:
+            if letter.lower() in LETTERS:
+                scores[letter_code(letter) - 1] = -1
+        scores[counts == 0] = -1
+        best = int(np.argmax(scores))
+        return LETTERS[best] if scores[best] >= 0 else None
@@ -0,0 +1,221 @@
+"""Benchmarks of the hot paths of the set game engine.
+
+Times `check_if_set`, `check_cards` on 12, 15, 21 and 81 cards and on tables without a set(the worst case),
+`opening_cards` with and without a set in the dealt cards, and `check_if_win` across a full game
+and on the first turns of the 6-attribute variant.
+Every benchmark is seeded, reports ops/sec and the peak memory allocated during an op, and is compared to
+the saved baseline.
+
+Example:
+    python benchmark.py          # run and compare to benchmark_baseline.json
+    python benchmark.py --save   # run and save the results as the new baseline
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import time
+import tracemalloc
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+SEED = 2023
+
+
+def _load_game_module():
+    """Returns the module of the game(its file name is not importable)."""
+    spec = importlib.util.spec_from_file_location("set_card_game", os.path.join(HERE, "set(card game).py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+set_game = _load_game_module()
+
+
+def _new_game(attributes=set_game.STANDARD_ATTRIBUTES):
+    """Returns a game with a seeded shuffled deck."""
+    game = set_game.SetGame(attributes=attributes)
+    game.deck.shuffle_deck()
+    return game
+
+
+def _set_free_cards(game, number):
+    """Returns up to `number` cards of the deck without a set between them(taken greedily)."""
+    cards = []
+    for card in game.deck.cards:
+        if len(cards) == number:
+            break
+        if not game.check_cards(cards + [card]):
+            cards.append(card)
+    return cards
+
+
+def bench_check_if_set():
+    game = _new_game()
+    return game.check_if_set, [random.sample(game.deck.cards, 3) for _ in range(1000)]
+
+
+def _bench_check_cards(number):
+    def bench():
+        game = _new_game()
+        return game.check_cards, [random.sample(game.deck.cards, number) for _ in range(100)]
+    return bench
+
+
+def bench_check_cards_set_free():
+    # The worst case, there is no set so every pair of cards is checked.
+    tables = []
+    for _ in range(100):
+        game = _new_game()
+        tables.append(_set_free_cards(game, 20))
+    return game.check_cards, tables
+
+
+def bench_opening_cards():
+    game = _new_game()
+    decks = []
+    for _ in range(100):
+        decks.append(list(_new_game().deck.cards))
+
+    def op(cards):
+        game.deck.cards = list(cards)
+        game.opening_cards()
+    return op, decks
+
+
+def bench_opening_cards_no_set():
+    # The dealt cards have no set, so a set is swapped in from the deck.
+    deals = []
+    for _ in range(100):
+        game = _new_game()
+        table = _set_free_cards(game, game.NUMBER_OF_OPEN_CARDS)
+        deals.append((table, [card for card in game.deck.cards if card not in table]))
+    game = _new_game()
+
+    def op(deal):
+        table, deck = deal
+        game.deck.cards = list(deck)
+        game.opening_cards(list(table))
+    return op, deals
+
+
+def bench_check_if_win_game():
+    # A whole game, taking the first set and checking for a win every turn.
+    def op(seed):
+        random.seed(seed)
+        game = _new_game()
+        open_cards = game.opening_cards()
+        with contextlib.redirect_stdout(io.StringIO()):
+            while True:
+                open_cards = game.remove_set_from_deck(open_cards, game.find_all_sets(open_cards)[0])
+                if game.check_if_win(open_cards):
+                    return
+                open_cards = game.opening_cards(open_cards)
+    return op, [SEED]
+
+
+def bench_check_if_win_6_attributes():
+    # The first turns of the 729-card variant, where the endgame search has the most cards.
+    game = _new_game(6)
+    open_cards = game.opening_cards()
+    tables = []
+    for _ in range(10):
+        open_cards = game.remove_set_from_deck(open_cards, game.find_all_sets(open_cards)[0])
+        tables.append((list(game.deck.cards), open_cards))
+        open_cards = game.opening_cards(open_cards)
+
+    def op(table):
+        deck, open_cards = table
+        game.deck.cards = deck
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.check_if_win(open_cards)
+    return op, tables
+
+
+BENCHMARKS = {
+    "check_if_set": bench_check_if_set,
+    "check_cards_12": _bench_check_cards(12),
+    "check_cards_15": _bench_check_cards(15),
+    "check_cards_21": _bench_check_cards(21),
+    "check_cards_81": _bench_check_cards(81),
+    "check_cards_set_free": bench_check_cards_set_free,
+    "opening_cards": bench_opening_cards,
+    "opening_cards_no_set": bench_opening_cards_no_set,
+    "check_if_win_game": bench_check_if_win_game,
+    "check_if_win_6_attributes": bench_check_if_win_6_attributes,
+}
+
+
+def run_benchmark(bench, min_time=0.5):
+    """Run one benchmark.
+
+    Args:
+        bench (function): Prepares the benchmark, returns (the function of one op, the input of each op).
+        min_time (float, optional): Repeat the timing at least this many seconds.
+
+    Returns:
+        dict: `ops_per_sec` and `bytes_per_op`(the most memory allocated during an op, on average).
+    """
+    random.seed(SEED)
+    op, inputs = bench()
+    for item in inputs:  # Warm up
+        op(item)
+    runs = 0
+    start = time.perf_counter()
+    while runs == 0 or time.perf_counter() - start < min_time:
+        for item in inputs:
+            op(item)
+        runs += 1
+    ops_per_sec = runs * len(inputs) / (time.perf_counter() - start)
+    # Every op is traced on its own, the peak above the memory before it is what it allocated.
+    allocated = 0
+    tracemalloc.start()
+    for item in inputs:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        op(item)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {"ops_per_sec": round(ops_per_sec, 1), "bytes_per_op": round(allocated / len(inputs))}
+
+
+def _change(new, old):
+    """Returns the change from the baseline as text."""
+    if not old:
+        return ""
+    return f"{(new - old) / old:+.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of the set game engine.")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to repeat each benchmark")
+    parser.add_argument("names", nargs="*", help="benchmarks to run(default is all)")
+    args = parser.parse_args()
+    try:
+        with open(BASELINE, "r") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        baseline = {}
+    results = {}
+    print(f"{'benchmark': <27}{'ops/sec': >14}{'change': >9}{'bytes/op': >12}{'change': >9}")
+    for name in args.names or BENCHMARKS:
+        result = results[name] = run_benchmark(BENCHMARKS[name], args.min_time)
+        old = baseline.get(name, {})
+        print(f"{name: <27}{result['ops_per_sec']: >14,.1f}{_change(result['ops_per_sec'], old.get('ops_per_sec')): >9}"
+              f"{result['bytes_per_op']: >12,}{_change(result['bytes_per_op'], old.get('bytes_per_op')): >9}")
+    if args.save:
+        baseline.update(results)
+        with open(BASELINE, "w") as file:
+            json.dump(baseline, file, indent=4, sort_keys=True)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
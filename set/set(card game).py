@@ -3,8 +3,9 @@
 The game will show the user 12 set cards from a mixed deck of 81 cards, and will allow the user to choose which 3 cards is a set.
 If the user chose a correct set, the three cards he chose are replaced by the following cards in the deck.
 If user select an incorrect set, an error message is printed.
-If it is not possible to make a set from the opened cards, return the cards to the deck, shuffle it and open 12 new cards.
+If it is not possible to make a set from the opened cards, cards from the deck are swapped in to make one.
 The player wins when no more sets can be made from the cards in the deck.
+There are harder variants with 3 to 6 attributes to each card(27 to 729 cards).
 
 Example:
     game = SetGame()
@@ -14,14 +15,121 @@ Check the instructions and game rules at:
 https://en.wikipedia.org/wiki/Set_(card_game)
 """
 
+import argparse
+from array import array
+import asyncio
+from collections import Counter
+from contextlib import closing
 import datetime
-from itertools import combinations
+from functools import lru_cache
+from itertools import product
+from multiprocessing import Pool
+import os
 import random
+import selectors
+import sqlite3
+import sys
 import time
 
 import colorama
 
 
+STANDARD_ATTRIBUTES = 4  # 81 cards, 4 attributes with 3 values each
+ENDGAME_MAX_LOOKUPS = 200000  # Pairs of cards the endgame search checks in a turn, about 0.05 second
+
+
+@lru_cache(maxsize=None)
+def third_card_table(attributes=STANDARD_ATTRIBUTES):
+    """Returns the table of the card that completes each pair of cards to a set.
+
+    Every card is encoded as an int 0..3**attributes - 1, each base-3 digit is the value of one attribute.
+    In a set every attribute is all the same or all different, so each digit of the third
+    card is `-(a + b) % 3`.
+    The table of each variant is built once, from the table with one attribute less,
+    and its rows are arrays of 2-byte ints to keep the 729-card table small.
+
+    Args:
+        attributes (int, optional): The number of attributes of the cards.
+
+    Returns:
+        list: `table[a][b]` is the index of the card that makes a set with cards `a` and `b`.
+    """
+    if attributes == 0:
+        return [array("H", [0])]
+    smaller = third_card_table(attributes - 1)
+    table = []
+    for first in range(3 ** attributes):
+        smaller_row = smaller[first // 3]
+        table.append(array("H", [smaller_row[second // 3] * 3 + (-first - second) % 3
+                                 for second in range(3 ** attributes)]))
+    return table
+
+CARD_COLORS = {
+    "Red": colorama.Fore.RED,
+    "Green": colorama.Fore.GREEN,
+    "Purple": colorama.Fore.MAGENTA,
+}
+
+
+def can_clear(cards_mask, attributes=STANDARD_ATTRIBUTES, max_lookups=None):
+    """Returns if the cards in the bitmask can all be taken as sets, in some order.
+
+    Every card must be in one of the taken sets, so only the sets of the card with
+    the fewest sets are tried, and a card without a set ends the search.
+    Positions(bitmasks of the remaining cards) that can not be cleared are remembered during the search.
+    The work of a position grows with the square of the cards left, so the search is limited by
+    the pairs of cards it checks, the same budget holds for every variant.
+
+    Args:
+        cards_mask (int): Bitmask of the remaining card indexes.
+        attributes (int, optional): The number of attributes of the cards.
+        max_lookups (int, optional): Stop after checking this many pairs of cards(default is `ENDGAME_MAX_LOOKUPS`).
+
+    Returns:
+        bool: If all the cards can be taken, `None` if the search stopped before it knew.
+    """
+    if max_lookups is None:
+        max_lookups = ENDGAME_MAX_LOOKUPS
+    third_card = third_card_table(attributes)
+    failed = set()
+    lookups = 0
+
+    def search(mask):
+        nonlocal lookups
+        if mask == 0:
+            return True
+        if mask in failed:
+            return False
+        indexes = []
+        rest = mask
+        while rest:
+            low = rest & -rest
+            indexes.append(low.bit_length() - 1)
+            rest ^= low
+        best_sets = None
+        for first in indexes:
+            lookups += len(indexes)
+            if lookups > max_lookups:
+                return None
+            row = third_card[first]
+            # Each set of the card is kept once, from its lower other card.
+            sets = [(second, row[second]) for second in indexes
+                    if second < row[second] and second != first and mask >> row[second] & 1]
+            if best_sets is None or len(sets) < len(best_sets):
+                best_sets = sets
+                best_card = first
+                if not sets:
+                    break
+        for second, third in best_sets:
+            result = search(mask & ~(1 << best_card | 1 << second | 1 << third))
+            if result is not False:
+                return result
+        failed.add(mask)
+        return False
+
+    return search(cards_mask)
+
+
 class Card:
     """Represents game card.
 
@@ -31,6 +139,10 @@ class Card:
         ("Empty", "Striped", "Full").
         color (str): The color of card("Red", "Green", "Purple").
         number (str): The numbers of shapes on the card("1", "2", "3").    
+        size (str): The size of the shapes("Small", "Medium", "Large"), only in variants with 5 attributes or more.
+        border (str): The border of the card("Thin", "Dashed", "Bold"), only in variants with 6 attributes.
+        index (int): The card encoded as int(a base-3 digit for each attribute of the variant), `None` until set.
+        attributes (int): The number of attributes of the variant of the card.
     """
 
     def __init__(self):
@@ -38,21 +150,177 @@ class Card:
         self.filling = ""
         self.color = ""
         self.number = ""
+        self.size = ""
+        self.border = ""
+        self.index = None
+        self.attributes = STANDARD_ATTRIBUTES
 
-    def set_card(self, shape, filling, color, number):
+    def set_card(self, shape, filling, color, number, size="", border="", attributes=STANDARD_ATTRIBUTES):
         """Set all Attributes of card."""
         self.shape = shape
         self.filling = filling
         self.color = color
         self.number = number
+        self.size = size
+        self.border = border
+        self.attributes = attributes
+        self.index = 0
+        for name in Deck.VARIANT_ATTRIBUTES[attributes]:
+            self.index = self.index * 3 + Deck.ATTRIBUTE_VALUES[name].index(getattr(self, name))
 
     def __str__(self):
-        colors = {
-        "Red": colorama.Fore.RED,
-        "Green": colorama.Fore.GREEN,
-        "Purple": colorama.Fore.MAGENTA,
-        }
-        return (colors[self.color] + f"{self.shape * int(self.number)} {self.filling}" + colorama.Style.RESET_ALL)
+        return card_texts(self.attributes)[self.index]
+
+
+def _render_card(shape, filling, color, number, size="", border=""):
+    """Returns the colored text of a card."""
+    text = " ".join(word for word in (shape * int(number), filling, size, border) if word)
+    return CARD_COLORS[color] + text + colorama.Style.RESET_ALL
+
+
+class TableRenderer:
+    """Full screen drawing of the open cards with ANSI escape codes.
+    Only the lines of the cards that changed since the last frame are drawn again,
+    and every frame is written at once.
+
+    Attributes:
+        lines (list): The card index shown on each line of the screen.
+        output (file): Where frames are written to.
+    """
+
+    def __init__(self, output=sys.stdout):
+        self.lines = None
+        self.output = output
+
+    def draw(self, cards):
+        """Draw the open cards, and leave the cursor under them for messages and input.
+
+        Args:
+            cards (list): The cards to show on the screen.
+
+        Returns:
+            None
+        """
+        frame = []
+        if self.lines is None:
+            frame.append(colorama.ansi.clear_screen())
+            self.lines = []
+        new_lines = [card.index for card in cards]
+        for num in range(max(len(new_lines), len(self.lines))):
+            index = new_lines[num] if num < len(new_lines) else None
+            if num < len(self.lines) and self.lines[num] == index:
+                continue
+            frame.append(colorama.Cursor.POS(1, num + 1) + colorama.ansi.clear_line())
+            if index is not None:
+                frame.append(f"{num + 1}. {cards[num]}")
+        self.lines = new_lines
+        # Clear the messages under the cards from the last turn.
+        frame.append(colorama.Cursor.POS(1, len(new_lines) + 2) + colorama.ansi.clear_screen(0))
+        self.output.write("".join(frame))
+        self.output.flush()
+
+
+class DeadlineInput:
+    """Reads lines of the player until a deadline, using the monotonic clock.
+    Waiting for a line never goes past the deadline, and on a terminal the time left
+    is shown above the prompt and updated every second.
+    Where the stream can not be waited on(like the Windows console), reading falls back to `input()`,
+    and the deadline is only checked after the line.
+
+    Attributes:
+        stream (file): Where lines are read from.
+        output (file): Where the prompt and the time left are written to.
+    """
+
+    def __init__(self, stream=sys.stdin, output=sys.stdout):
+        self.stream = stream
+        self.output = output
+        self._buffer = b""
+
+    def _print_time_left(self, seconds_left, move_up=False):
+        """Write the time left, on the line above the cursor if `move_up`."""
+        minutes, seconds = divmod(int(seconds_left + 0.999), 60)
+        text = f"Time left: {minutes}:{seconds:02}"
+        if move_up:
+            text = "\x1b7" + colorama.Cursor.UP() + "\r" + colorama.ansi.clear_line() + text + "\x1b8"
+        else:
+            text += "\n"
+        self.output.write(text)
+        self.output.flush()
+
+    def _selector(self):
+        """Returns a selector on the stream, `None` where the stream can not be waited on."""
+        if os.name == "nt":  # select() only works on sockets on Windows
+            return None
+        try:
+            selector = selectors.DefaultSelector()
+            selector.register(self.stream.fileno(), selectors.EVENT_READ)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return selector
+
+    def _fallback_input(self, prompt, deadline):
+        """Reads a line with `input()`, the deadline is only checked after the line."""
+        try:
+            line = input(prompt)
+        except EOFError:
+            if deadline is None:
+                raise
+            return None
+        return line if deadline is None or time.monotonic() < deadline else None
+
+    def input(self, prompt, deadline=None):
+        """Returns a line of the player, or `None` if the deadline passed first.
+        All the lines of the game should be read here, lines that came together are kept for the next reads.
+
+        Args:
+            prompt (str): The text to show before the input.
+            deadline (float, optional): The time to stop waiting, in `time.monotonic()` seconds(default is no limit).
+
+        Returns:
+            str: The line without the newline, `None` when the time is over or the stream ended.
+
+        Raises:
+            EOFError: If the stream ended and there is no deadline(like `input()`).
+        """
+        selector = None if b"\n" in self._buffer else self._selector()
+        if selector is None and b"\n" not in self._buffer:
+            return self._fallback_input(prompt, deadline)
+        show_time = deadline is not None and selector is not None and self.stream.isatty()
+        if show_time:
+            self._print_time_left(deadline - time.monotonic())
+        self.output.write(prompt)
+        self.output.flush()
+        while b"\n" not in self._buffer:
+            if deadline is None:
+                timeout = None
+            else:
+                time_left = deadline - time.monotonic()
+                if time_left <= 0:
+                    selector.close()
+                    self.output.write("\n")
+                    return None
+                # Wake up on the next whole second to update the time left.
+                timeout = time_left % 1 or 1
+            try:
+                ready = selector.select(timeout)
+            except OSError:
+                selector.close()
+                return self._fallback_input("", deadline)
+            if ready:
+                data = os.read(self.stream.fileno(), 4096)
+                if not data:
+                    selector.close()
+                    if deadline is None:
+                        raise EOFError
+                    return None
+                self._buffer += data
+            elif show_time:
+                self._print_time_left(deadline - time.monotonic(), move_up=True)
+        if selector is not None:
+            selector.close()
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.decode().rstrip("\r")
 
 
 class Deck:
@@ -60,15 +328,53 @@ class Deck:
 
     Attributes:
         cards (list): List of cards in deck.
-        Initializes empty, but will later contain 81 and less.
+        Initializes empty, but will later contain 3**attributes(81 in the standard game) and less.
+        attributes (int): The number of attributes of the cards(3 to 6).
     """
     SHAPES = ("◆", "~", "●")
     FILLING_OF_SHAPES = ("Empty", "Striped", "Full")
     COLOR_OF_SHAPES = ("Red", "Green", "Purple")
     NUMBER_OF_SHAPES = ("1", "2", "3")
+    SIZE_OF_SHAPES = ("Small", "Medium", "Large")
+    BORDER_OF_CARD = ("Thin", "Dashed", "Bold")
+    ATTRIBUTE_VALUES = {
+        "shape": SHAPES,
+        "filling": FILLING_OF_SHAPES,
+        "color": COLOR_OF_SHAPES,
+        "number": NUMBER_OF_SHAPES,
+        "size": SIZE_OF_SHAPES,
+        "border": BORDER_OF_CARD,
+    }
+    # The attributes of each variant, in the order of the digits of the card index.
+    # Without filling, all the shapes are full.
+    VARIANT_ATTRIBUTES = {
+        3: ("shape", "color", "number"),
+        4: ("shape", "filling", "color", "number"),
+        5: ("shape", "filling", "color", "number", "size"),
+        6: ("shape", "filling", "color", "number", "size", "border"),
+    }
 
-    def __init__(self):
+    def __init__(self, attributes=STANDARD_ATTRIBUTES):
         self.cards = []
+        self.attributes = attributes
+
+    @classmethod
+    def all_cards_details(cls, attributes=STANDARD_ATTRIBUTES):
+        """Returns the details of all the cards, in the order of their index.
+
+        Args:
+            attributes (int, optional): The number of attributes of the cards.
+
+        Returns:
+            list: `(shape, filling, color, number, size, border)` tuples.
+        """
+        names = cls.VARIANT_ATTRIBUTES[attributes]
+        all_details = []
+        for values in product(*(cls.ATTRIBUTE_VALUES[name] for name in names)):
+            details = dict(zip(names, values))
+            all_details.append((details["shape"], details.get("filling", "Full"), details["color"],
+                                details["number"], details.get("size", ""), details.get("border", "")))
+        return all_details
 
     def set_deck(self):
         """Creates all the cards in the deck.
@@ -76,43 +382,184 @@ class Deck:
         Returns:
             None
         """
-        for shape in self.SHAPES:
-            for filling in self.FILLING_OF_SHAPES:
-                for color in self.COLOR_OF_SHAPES:
-                    for number in self.NUMBER_OF_SHAPES:
-                        card = Card()
-                        card.set_card(shape, filling, color, number)
-                        self.cards.append(card)
+        for details in self.all_cards_details(self.attributes):
+            card = Card()
+            card.set_card(*details, attributes=self.attributes)
+            self.cards.append(card)
 
     def shuffle_deck(self):
         """Randomly shuffle the deck."""
         random.shuffle(self.cards)
 
+    def draw_card(self):
+        """Draws the top card of the deck (the end of the list, so it is O(1)).
 
-class SetGame:
-    """The game set.
-    Allows to manage a set game with one player who chooses sets, until he wins when there are no more sets left in the cards.
+        Returns:
+            Card: The drawn card.
+        """
+        return self.cards.pop()
+
+
+@lru_cache(maxsize=None)
+def card_texts(attributes=STANDARD_ATTRIBUTES):
+    """Returns the text of every card of the variant, in the order of their index(rendered once)."""
+    return [_render_card(*details) for details in Deck.all_cards_details(attributes)]
+
+
+class Scoreboard:
+    """Scoreboard of the run time mode, saved in a SQLite database.
+    Scores are indexed by score, player and date, so the queries do not scan the whole scoreboard,
+    and SQLite locks the database so several games can write to it at the same time.
 
     Attributes:
-        deck (Deck): An instance of a class that represents a deck of playing cards, and tools for the deck.
+        path (str): The path of the database file.
     """
-    NUMBER_OF_OPEN_CARDS = 12
+    TEXT_SCOREBOARD = "set_scoreboard.txt"
+    VERSION = 1  # Saved in `PRAGMA user_version` once the tables are created and the text scoreboard imported
 
-    def __init__(self):
-        self.deck = Deck()
-        self.deck.set_deck()
+    def __init__(self, path="set_scoreboard.db"):
+        self.path = path
+        with closing(self._connect()) as connection:
+            if self._version(connection) < self.VERSION:
+                self._create(connection)
 
-    def _create_optional_sets(self, cards):
-        """Creates all set options in given cards.
+    @staticmethod
+    def _version(connection):
+        """Returns the version of the database, 0 for a new database."""
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def _create(self, connection):
+        """Create the tables and import the text scoreboard once.
+        The write lock is taken first, so when several games open a new database only the first creates it."""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if self._version(connection) < self.VERSION:
+                connection.execute("CREATE TABLE IF NOT EXISTS scores (name TEXT, date TEXT, score INTEGER)")
+                connection.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score)")
+                connection.execute("CREATE INDEX IF NOT EXISTS scores_by_name ON scores (name, score)")
+                connection.execute("CREATE INDEX IF NOT EXISTS scores_by_date ON scores (date)")
+                # A database of an older version may have imported the text scoreboard already.
+                if connection.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None:
+                    self._import_text_scoreboard(connection)
+                connection.execute(f"PRAGMA user_version = {self.VERSION}")
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+    def _connect(self):
+        """Returns a connection to the database, waiting for other writers to finish."""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _import_text_scoreboard(self, connection):
+        """Import the scores of the old text scoreboard(`name, dd.mm.yyyy, score` lines).
+        The name may contain ", ", lines that can not be read are skipped."""
+        try:
+            with open(self.TEXT_SCOREBOARD, "r") as file:
+                for line in file:
+                    try:
+                        name, date, score = line.strip().rsplit(", ", 2)
+                        date = datetime.datetime.strptime(date, "%d.%m.%Y").date()
+                        score = int(score)
+                    except ValueError:
+                        continue
+                    connection.execute("INSERT INTO scores VALUES (?, ?, ?)", (name, date.isoformat(), score))
+        except FileNotFoundError:
+            pass
+
+    def add_score(self, name, score, date=None):
+        """Save a score.
 
         Args:
-            cards (list): List of cards.
+            name (str): The name of the player.
+            score (int): The score.
+            date (datetime.date, optional): The date of the game(default is today).
 
         Returns:
-            set: All set options.
+            None
         """
-        optional_sets = set(combinations(cards, 3))
-        return optional_sets
+        if date is None:
+            date = datetime.date.today()
+        with closing(self._connect()) as connection, connection:
+            connection.execute("INSERT INTO scores VALUES (?, ?, ?)", (name, date.isoformat(), score))
+
+    def _query(self, query, parameters):
+        """Returns the `(name, date, score)` rows of the query, the dates as `datetime.date`."""
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute(query, parameters).fetchall()
+        return [(name, datetime.date.fromisoformat(date), score) for name, date, score in rows]
+
+    def top(self, number=10):
+        """Returns the best scores.
+
+        Args:
+            number (int, optional): The number of scores.
+
+        Returns:
+            list: `(name, date, score)` tuples, from the highest score.
+        """
+        return self._query("SELECT name, date, score FROM scores ORDER BY score DESC LIMIT ?", (number,))
+
+    def best_of(self, name):
+        """Returns the best score of a player.
+
+        Args:
+            name (str): The name of the player.
+
+        Returns:
+            tuple: `(name, date, score)`, or `None` if the player has no score.
+        """
+        rows = self._query("SELECT name, date, score FROM scores WHERE name = ? ORDER BY score DESC LIMIT 1", (name,))
+        return rows[0] if rows else None
+
+    def between(self, start, end):
+        """Returns the scores of the games between two dates(including both).
+
+        Args:
+            start (datetime.date): The first date.
+            end (datetime.date): The last date.
+
+        Returns:
+            list: `(name, date, score)` tuples, from the highest score.
+        """
+        return self._query("SELECT name, date, score FROM scores WHERE date BETWEEN ? AND ? ORDER BY score DESC",
+                           (start.isoformat(), end.isoformat()))
+
+
+class SetGame:
+    """The game set.
+    Allows to manage a set game with one player who chooses sets, until he wins when there are no more sets left in the cards.
+
+    Attributes:
+        deck (Deck): An instance of a class that represents a deck of playing cards, and tools for the deck.
+        third_card (list): The table of the card that completes each pair of cards of the deck to a set.
+        scoreboard (Scoreboard): The scoreboard of the run time mode, opened on first use.
+        renderer (TableRenderer): Draws the open cards full screen, `None` to print them as text.
+        player_input (DeadlineInput): Reads the lines of the player.
+        deals (int): How many times open cards were checked for a set while opening cards.
+        no_set_deals (int): How many times the open cards had no set and a set was swapped in from the deck.
+        free_positions (list): The positions of the last set taken from the open cards, new cards are opened there.
+        can_clear (bool): If the cards left could all be taken as sets at the last check(`None` if unknown).
+    """
+    NUMBER_OF_OPEN_CARDS = 12
+    # Open cards of the variants, by the number of attributes.
+    VARIANT_OPEN_CARDS = {3: 9, 4: 12, 5: 15, 6: 18}
+
+    def __init__(self, full_screen=False, attributes=STANDARD_ATTRIBUTES, open_cards=None):
+        self.deck = Deck(attributes)
+        self.deck.set_deck()
+        self.third_card = third_card_table(attributes)
+        if open_cards is not None or attributes != STANDARD_ATTRIBUTES:
+            self.NUMBER_OF_OPEN_CARDS = open_cards or self.VARIANT_OPEN_CARDS[attributes]
+        self.renderer = TableRenderer() if full_screen else None
+        self.player_input = DeadlineInput()
+        self.deals = 0
+        self.no_set_deals = 0
+        self.free_positions = []
+        self.can_clear = True
+        self.scoreboard = None
 
     def check_if_set(self, given_set):
         """Returns if the selected set is a valid set.
@@ -123,15 +570,8 @@ class SetGame:
         Returns:
             bool: If valid set.
         """
-        colors = [card.color for card in given_set]
-        fillings = [card.filling for card in given_set]
-        numbers = [card.number for card in given_set]
-        shapes = [card.shape for card in given_set]
-        cards_detail = (colors, fillings, numbers, shapes)
-        for detail in cards_detail:
-            if len(set(detail)) == 2:
-                return False
-        return True
+        first, second, third = given_set
+        return self.third_card[first.index][second.index] == third.index
 
     def check_cards(self, cards):
         """Returns if in the given cards, there is a valid set.
@@ -142,14 +582,121 @@ class SetGame:
         Returns:
             bool: if in the given cards, there is a valid set.
         """
-        optional_sets = self._create_optional_sets(cards)
-        for optional_set in optional_sets:
-            if self.check_if_set(optional_set):
-                return True
+        # Look up the card that completes each pair, instead of checking every triple.
+        indexes = [card.index for card in cards]
+        on_table = 0
+        for index in indexes:
+            on_table |= 1 << index
+        for num, first in enumerate(indexes):
+            row = self.third_card[first]
+            for second in indexes[num + 1:]:
+                if on_table >> row[second] & 1:
+                    return True
         return False
 
+    def find_all_sets(self, cards):
+        """Returns all the valid sets in the given cards.
+
+        Args:
+            cards (list): Cards to check.
+
+        Returns:
+            list: All valid sets, each set is a tuple of 3 cards in the order of `cards`.
+        """
+        positions = {card.index: num for num, card in enumerate(cards)}
+        all_sets = []
+        for num, first in enumerate(cards):
+            row = self.third_card[first.index]
+            for second_num in range(num + 1, len(cards)):
+                second = cards[second_num]
+                # Every set is found once, from its two first cards.
+                third_num = positions.get(row[second.index], -1)
+                if third_num > second_num:
+                    all_sets.append((first, second, cards[third_num]))
+        return all_sets
+
+    def count_sets(self, cards):
+        """Returns the number of valid sets in the given cards.
+
+        Args:
+            cards (list): Cards to check.
+
+        Returns:
+            int: The number of valid sets.
+        """
+        indexes = [card.index for card in cards]
+        on_table = 0
+        for index in indexes:
+            on_table |= 1 << index
+        count = 0
+        for num, first in enumerate(indexes):
+            row = self.third_card[first]
+            for second in indexes[num + 1:]:
+                count += on_table >> row[second] & 1
+        # Each set was counted once for each of its 3 pairs.
+        return count // 3
+
+    def analyze_endgame(self, open_cards):
+        """Analyzes the cards left in the deck and on the table.
+
+        Args:
+            open_cards (list): The open cards.
+
+        Returns:
+            dict: `set_left` - if there is a set in the deck and the open cards together,
+            `can_clear` - if all these cards can still be taken as sets by some sequence of picks
+            (`None` if the search stopped before it knew, see `can_clear`).
+        """
+        all_cards = self.deck.cards + open_cards
+        cards_mask = 0
+        for card in all_cards:
+            cards_mask |= 1 << card.index
+        clear = len(all_cards) % 3 == 0 and can_clear(cards_mask, self.deck.attributes)
+        return {"set_left": self.check_cards(all_cards), "can_clear": clear}
+
+    def _find_set_for_table(self, open_cards):
+        """Finds a set in the open cards and the deck with as many open cards as possible.
+
+        Args:
+            open_cards (list): The open cards.
+
+        Returns:
+            tuple: The cards of the set, or `None` if there is no set left.
+        """
+        in_deck = {card.index: card for card in self.deck.cards}
+        for first_cards, second_cards in ((open_cards, open_cards), (open_cards, self.deck.cards),
+                                          (self.deck.cards, self.deck.cards)):
+            for first in first_cards:
+                row = self.third_card[first.index]
+                for second in second_cards:
+                    third = in_deck.get(row[second.index])
+                    if first is not second and third is not None:
+                        return first, second, third
+        return None
+
+    def _swap_set_to_table(self, open_cards):
+        """Swaps cards of the deck with open cards, so there is a set in the open cards.
+
+        Args:
+            open_cards (list): The open cards(there is no set in them).
+
+        Returns:
+            None
+        """
+        found_set = self._find_set_for_table(open_cards)
+        if found_set is None:
+            return
+        deck_positions = {card.index: num for num, card in enumerate(self.deck.cards)}
+        open_positions = [num for num, card in enumerate(open_cards) if card not in found_set]
+        for card in found_set:
+            if card.index in deck_positions:
+                deck_num = deck_positions[card.index]
+                open_num = open_positions.pop()
+                self.deck.cards[deck_num], open_cards[open_num] = open_cards[open_num], card
+
     def opening_cards(self, exposed_cards=None):
-        """Opens up to 12 set cards(if they have a possible set).
+        """Opens up to 12 set cards.
+        If there is no set in them, cards from the deck are swapped in to make one.
 
         Args:
             exposed_cards (list, optional): The exposed cards, (at the beginning of the game is empty).
@@ -159,15 +706,20 @@ class SetGame:
         """
         if exposed_cards is None:
             exposed_cards = []
-        while True:
-            while len(self.deck.cards) != 0 and len(exposed_cards) != self.NUMBER_OF_OPEN_CARDS:
-                card = self.deck.cards[0]
-                self.deck.cards.remove(card)
-                exposed_cards.append(card)
-            if self.check_cards(exposed_cards):
-                return exposed_cards
-            self.deck.cards.extend(exposed_cards)
-            self.deck.shuffle_deck()
+        else:
+            # The new cards take the places of the set, so the other cards keep their numbers.
+            for position in self.free_positions:
+                if len(self.deck.cards) == 0 or len(exposed_cards) == self.NUMBER_OF_OPEN_CARDS:
+                    break
+                exposed_cards.insert(position, self.deck.draw_card())
+        self.free_positions = []
+        while len(self.deck.cards) != 0 and len(exposed_cards) != self.NUMBER_OF_OPEN_CARDS:
+            exposed_cards.append(self.deck.draw_card())
+        self.deals += 1
+        if not self.check_cards(exposed_cards):
+            self.no_set_deals += 1
+            self._swap_set_to_table(exposed_cards)
+        return exposed_cards
 
     def print_cards(self, cards):
         """Print cards.
@@ -178,9 +730,10 @@ class SetGame:
         Returns:
             None
         """
-        table = ""
-        for num, card in enumerate(cards, start=1):
-            table += f"{num}. {card}\n"
+        if self.renderer is not None:
+            self.renderer.draw(cards)
+            return
+        table = "".join(f"{num}. {card}\n" for num, card in enumerate(cards, start=1))
         print(table)
 
     def remove_set_from_deck(self, open_cards, cards):
@@ -193,6 +746,7 @@ class SetGame:
         Returns:
             list: The cards that are shown to the player.
         """
+        self.free_positions = sorted(open_cards.index(old_card) for old_card in cards)
         for old_card in cards:
             open_cards.remove(old_card)
         return open_cards
@@ -207,24 +761,49 @@ class SetGame:
         Returns:
             list: The cards that are shown to the player.
         """
+        self.free_positions = sorted(open_cards.index(old_card) for old_card in cards)
         for old_card in cards:
             open_cards.remove(old_card)
             self.deck.cards.append(old_card)
         return open_cards
 
-    def check_user_answer(self, open_cards):
+    def print_hint(self, open_cards):
+        """Print the numbers of the cards of one set in the open cards.
+
+        Args:
+            open_cards (list): The open cards.
+
+        Returns:
+            None
+        """
+        all_sets = self.find_all_sets(open_cards)
+        if all_sets:
+            hint = ", ".join(str(open_cards.index(card) + 1) for card in all_sets[0])
+            print(f"There are {len(all_sets)} sets, try: {hint}")
+        else:
+            print("There is no set in the open cards.")
+
+    def check_user_answer(self, open_cards, deadline=None):
         """Receives an answer from the user and checks if it is valid.
+        The user can enter `hint` to reveal one set.
 
         Args:
             open_cards (list): The open cards.
+            deadline (float, optional): Stop waiting for an answer at this `time.monotonic()` time.
 
         Returns:
-            list: Valid answer from the user.
+            list: Valid answer from the user, `None` if the deadline passed first.
         """
+        prompt = "Enter a set(the number of card separate by a comma, or hint): "
         check_answer = True
         while check_answer != 3:
             check_answer = 0
-            user_answer = input("Enter a set(the number of card separate by a comma): ")
+            user_answer = self.player_input.input(prompt, deadline)
+            if user_answer is None:
+                return None
+            if user_answer.strip().lower() == "hint":
+                self.print_hint(open_cards)
+                continue
             user_answer = [answer.strip() for answer in user_answer.split(",")]
             for answer in user_answer:
                 if len(set(user_answer)) == 3 and answer.isdigit() and int(answer) in range(1, len(open_cards) + 1):
@@ -233,6 +812,7 @@ class SetGame:
 
     def check_if_win(self, open_cards):
         """Checks if the player has won (no more possible sets left).
+        Tells the player once when the cards left can no longer all be taken as sets.
 
         Args:
             open_cards (list): The open cards.
@@ -240,33 +820,47 @@ class SetGame:
         Returns:
             bool: If player won and game is over.
         """
-        # When 21 cards remain, there is necessarily a set.
-        if len(self.deck.cards) + len(open_cards) <= 21:
-            all_cards = self.deck.cards + open_cards
-            if not self.check_cards(all_cards):
-                print("You win!")
-                return True
-
-    def print_scoreboard(self):
-        """Print scoreboard"""
-        try:
-            with open("set_scoreboard.txt", "r") as file:
-                file = file.read().split("\n")
-                for line in file:
-                    line_to_print = ""
-                    for word in line.split(", "):
-                        line_to_print += f"{word: <13}"
-                    print(line_to_print)
-        except FileNotFoundError:
-            pass
+        analysis = self.analyze_endgame(open_cards)
+        if not analysis["set_left"]:
+            print("You win!")
+            return True
+        if analysis["can_clear"] is False and self.can_clear is not False:
+            print("The cards left can not all be taken as sets anymore.")
+        self.can_clear = analysis["can_clear"]
+
+    def is_game_over(self, open_cards):
+        """Returns if no more possible sets left, without printing.
+
+        Args:
+            open_cards (list): The open cards.
+
+        Returns:
+            bool: If game is over.
+        """
+        return not self.check_cards(self.deck.cards + open_cards)
+
+    def _get_scoreboard(self):
+        """Returns the scoreboard, opens it on first use."""
+        if self.scoreboard is None:
+            self.scoreboard = Scoreboard()
+        return self.scoreboard
+
+    def print_scoreboard(self, number=10):
+        """Print the best scores of the scoreboard.
+
+        Args:
+            number (int, optional): The number of scores to print.
+
+        Returns:
+            None
+        """
+        for name, date, score in self._get_scoreboard().top(number):
+            print(f"{name: <13}{date.strftime('%d.%m.%Y'): <13}{score: <13}")
 
     def save_score(self, score):
         """Save data to scoreboard"""
-        with open("set_scoreboard.txt", "a") as file:
-            name = input("Enter your name: ")
-            date = datetime.datetime.now().strftime("%d.%m.%Y")
-            data = f"{name}, {date}, {score}\n"
-            file.write(data)
+        name = self.player_input.input("Enter your name: ")
+        self._get_scoreboard().add_score(name, score)
 
     def run_time_game(self):
         """Play Run time game.
@@ -279,23 +873,21 @@ class SetGame:
         Returns:
             bool: If game is over.
         """
-        timer = 3 * 60  # 3 minutes in seconds
-        start_time = time.time()
+        deadline = time.monotonic() + 3 * 60  # 3 minutes in seconds
         score = 0
         self.deck.shuffle_deck()
         open_cards = self.opening_cards()
         self.print_cards(open_cards)
-        while time.time() - start_time < timer:
-            user_answer = self.check_user_answer(open_cards)
+        while True:
+            # Answers are only read until the deadline, so every set found is in time.
+            user_answer = self.check_user_answer(open_cards, deadline)
+            if user_answer is None:
+                break
             user_set_answer = [open_cards[answer - 1] for answer in user_answer]
             if self.check_if_set(user_set_answer):
                 print("Nice!")
-                timer += 5  # Add seconds to timer
+                deadline += 5  # Add seconds to timer
                 score += 1
-                if time.time() - start_time >= timer:
-                    print("Time over")
-                    self.save_score(score)
-                    return True
                 open_cards = self.returning_set_to_the_deck(open_cards, user_set_answer)
                 self.deck.shuffle_deck()
                 open_cards = self.opening_cards(open_cards)
@@ -331,19 +923,298 @@ class SetGame:
 
     def play_game(self):
         """Game management"""
-        game = input("Do you want to play normal game or run time game(n/r)? ")
+        game = self.player_input.input("Do you want to play normal game or run time game(n/r)? ")
         if game == "n":
             self.normal_game()
         elif game == "r":
             self.run_time_game()
-            scoreboard = input("do you want to print the scoreboard(y/n)? ")
+            scoreboard = self.player_input.input("do you want to print the scoreboard(y/n)? ")
             if scoreboard == "y":
                 self.print_scoreboard()
         return None
 
 
-def main():
+class SetTable:
+    """A multiplayer table of the server, players race to claim sets on the same open cards.
+
+    Attributes:
+        name (str): The name of the table.
+        game (SetGame): The engine of the table.
+        open_cards (list): The open cards.
+        version (int): Grows every time the open cards change, claims are made on a version.
+        players (dict): The name of the player of each connection(`asyncio.StreamWriter`).
+        scores (dict): The number of sets of each player name.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.game = SetGame()
+        self.game.deck.shuffle_deck()
+        self.open_cards = self.game.opening_cards()
+        self.version = 1
+        self.players = {}
+        self.scores = {}
+
+    def is_over(self):
+        """Returns if no more sets are left on the table."""
+        return self.game.is_game_over(self.open_cards)
+
+    def claim(self, name, numbers, version):
+        """Claims a set for a player.
+        Claims do not wait in between, so the first valid claim on a version wins,
+        and claims on an older version are rejected.
+
+        Args:
+            name (str): The name of the player.
+            numbers (list): The numbers of the 3 cards(from 1).
+            version (int): The version of the open cards the player saw.
+
+        Returns:
+            tuple: (If the claim won, a message to the player).
+        """
+        if version != self.version:
+            return False, "Too late, the cards changed."
+        if len(set(numbers)) != 3 or not all(1 <= number <= len(self.open_cards) for number in numbers):
+            return False, "Enter 3 different card numbers."
+        cards = [self.open_cards[number - 1] for number in numbers]
+        if not self.game.check_if_set(cards):
+            return False, "Oops... that is not a set."
+        self.open_cards = self.game.remove_set_from_deck(self.open_cards, cards)
+        if not self.is_over():
+            self.open_cards = self.game.opening_cards(self.open_cards)
+        self.version += 1
+        self.scores[name] = self.scores.get(name, 0) + 1
+        return True, "Nice!"
+
+    def render(self):
+        """Returns the text of the table that is sent to the players."""
+        lines = [f"table {self.name} version {self.version}"]
+        lines += [f"{num}. {card}" for num, card in enumerate(self.open_cards, start=1)]
+        scores = ", ".join(f"{name}: {score}" for name, score in sorted(self.scores.items(), key=lambda item: -item[1]))
+        lines.append(f"scores {scores}")
+        if self.is_over():
+            lines.append("game over")
+        return "\n".join(lines) + "\n"
+
+
+class SetServer:
+    """Multiplayer set server, many tables in one process, with a line protocol over TCP.
+
+    Commands of a client(one per line):
+        join <table> <name> - join a table(it is opened on the first join).
+        set <a>,<b>,<c> <version> - claim a set on the version of the table the client saw,
+                                    the table is sent to all the players of the table.
+        quit - leave the server.
+
+    Attributes:
+        tables (dict): The open tables by name.
+    """
+    MAX_WRITE_BUFFER = 64 * 1024  # A client that has more bytes waiting to be sent is disconnected.
+
+    def __init__(self):
+        self.tables = {}
+
+    async def start(self, host="127.0.0.1", port=8888):
+        """Start listening.
+
+        Args:
+            host (str, optional): The address to listen on.
+            port (int, optional): The port to listen on(0 for any free port).
+
+        Returns:
+            asyncio.Server: The listening server.
+        """
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def _broadcast(self, table):
+        """Send the table to all the players of the table, and disconnect the players that do not read."""
+        data = table.render().encode()
+        for writer in list(table.players):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.MAX_WRITE_BUFFER:
+                self._leave(writer, table)
+                writer.close()
+                continue
+            writer.write(data)
+
+    def _leave(self, writer, table):
+        """Remove the player from the table, and close the table when it is empty."""
+        if table is not None:
+            table.players.pop(writer, None)
+            if not table.players and self.tables.get(table.name) is table:
+                del self.tables[table.name]
+
+    def handle_command(self, writer, table, line):
+        """Runs one command of a client.
+
+        Args:
+            writer (asyncio.StreamWriter): The connection of the client.
+            table (SetTable): The table of the client, `None` before joining.
+            line (str): The command.
+
+        Returns:
+            SetTable: The table of the client after the command.
+        """
+        command, _, argument = line.strip().partition(" ")
+        if command == "join":
+            table_name, _, name = argument.strip().partition(" ")
+            if not table_name or not name.strip():
+                writer.write(b"error join <table> <name>\n")
+                return table
+            self._leave(writer, table)
+            table = self.tables.get(table_name)
+            if table is None or table.is_over():
+                table = self.tables[table_name] = SetTable(table_name)
+            table.players[writer] = name.strip()
+            writer.write(table.render().encode())
+        elif command == "set" and table is not None and writer in table.players:
+            numbers, _, version = argument.strip().partition(" ")
+            try:
+                numbers = [int(number) for number in numbers.split(",")]
+                version = int(version)
+            except ValueError:
+                writer.write(b"error set <a>,<b>,<c> <version>\n")
+                return table
+            won, message = table.claim(table.players[writer], numbers, version)
+            writer.write(f"{message}\n".encode())
+            if won:
+                self._broadcast(table)
+        else:
+            writer.write(b"error join <table> <name>, set <a>,<b>,<c> <version> or quit\n")
+        return table
+
+    async def handle_client(self, reader, writer):
+        """Serve one client until it quits or disconnects."""
+        table = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or line.strip() == b"quit":
+                    break
+                table = self.handle_command(writer, table, line.decode(errors="replace"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._leave(writer, table)
+            writer.close()
+
+
+async def serve(host, port):
+    """Run the multiplayer server until it is stopped."""
+    server = await SetServer().start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def simulate_game(seed):
+    """Play a whole normal game without input or printing, the player always takes the first set.
+
+    Args:
+        seed (int): Seed of the random shuffles.
+
+    Returns:
+        tuple: (deals, deals with no set, sets found, cards left at the end of the game).
+    """
+    random.seed(seed)
     game = SetGame()
+    game.deck.shuffle_deck()
+    open_cards = game.opening_cards()
+    sets_found = 0
+    while True:
+        open_cards = game.remove_set_from_deck(open_cards, game.find_all_sets(open_cards)[0])
+        sets_found += 1
+        if game.is_game_over(open_cards):
+            return game.deals, game.no_set_deals, sets_found, len(game.deck.cards) + len(open_cards)
+        open_cards = game.opening_cards(open_cards)
+
+
+def _simulate_games(seeds):
+    """Play games for all the given seeds and return their statistics (runs in a worker process).
+
+    Args:
+        seeds (range): Seed of each game.
+
+    Returns:
+        dict: Statistics of the games, see `simulate`.
+    """
+    stats = {
+        "games": 0,
+        "deals": 0,
+        "no_set_deals": 0,
+        "no_set_deals_per_game": Counter(),
+        "sets_per_game": Counter(),
+        "leftover_cards": Counter(),
+    }
+    for seed in seeds:
+        deals, no_set_deals, sets_found, leftover = simulate_game(seed)
+        stats["games"] += 1
+        stats["deals"] += deals
+        stats["no_set_deals"] += no_set_deals
+        stats["no_set_deals_per_game"][no_set_deals] += 1
+        stats["sets_per_game"][sets_found] += 1
+        stats["leftover_cards"][leftover] += 1
+    return stats
+
+
+def simulate(games, processes=None, seed=0, chunk_size=1000):
+    """Play many headless games in a process pool and aggregate their statistics.
+
+    Args:
+        games (int): The number of games to play.
+        processes (int, optional): The number of worker processes(default is the number of CPUs).
+        seed (int, optional): Seed of the first game, game number `n` uses `seed + n`.
+        chunk_size (int, optional): The number of games sent to a worker at once.
+
+    Returns:
+        dict: `games`, `deals`, `no_set_deals`, `no_set_probability` and the counters
+        `no_set_deals_per_game`, `sets_per_game` and `leftover_cards`.
+    """
+    chunks = [range(start, min(start + chunk_size, seed + games)) for start in range(seed, seed + games, chunk_size)]
+    with Pool(processes) as pool:
+        results = pool.imap_unordered(_simulate_games, chunks)
+        stats = next(results, None) or _simulate_games(range(0))
+        for chunk_stats in results:
+            for key, value in chunk_stats.items():
+                stats[key] += value
+    stats["no_set_probability"] = stats["no_set_deals"] / stats["deals"] if stats["deals"] else 0.0
+    return stats
+
+
+def print_simulation(stats):
+    """Print the statistics of `simulate`."""
+    games = stats["games"] or 1
+    print(f"Games: {stats['games']}")
+    print(f"No set probability: {stats['no_set_probability']:.4%}")
+    print(f"No set deals per game: {stats['no_set_deals'] / games:.3f}")
+    for title, key in (("No set deals", "no_set_deals_per_game"), ("Sets found", "sets_per_game"), ("Cards left", "leftover_cards")):
+        print(f"\n{title: <13}Games")
+        for value, count in sorted(stats[key].items()):
+            print(f"{value: <13}{count} ({count / games:.2%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Standard set game to one player and run time mode.")
+    parser.add_argument("--attributes", type=int, choices=sorted(Deck.VARIANT_ATTRIBUTES),
+                        default=STANDARD_ATTRIBUTES, help="number of card attributes of the variant(3**attributes cards)")
+    parser.add_argument("--open-cards", type=int, help="number of open cards(default depends on the variant)")
+    parser.add_argument("--full-screen", action="store_true", help="draw the cards full screen")
+    parser.add_argument("--server", type=int, metavar="PORT", help="run the multiplayer server on PORT")
+    parser.add_argument("--host", default="127.0.0.1", help="address of the multiplayer server")
+    parser.add_argument("--simulate", type=int, metavar="GAMES", help="play GAMES headless games and print statistics")
+    parser.add_argument("--processes", type=int, help="number of worker processes for --simulate")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first simulated game")
+    args = parser.parse_args()
+    if args.open_cards is not None and not 3 <= args.open_cards <= 3 ** args.attributes:
+        parser.error(f"argument --open-cards: must be between 3 and {3 ** args.attributes}(the cards of the deck)")
+    if args.server is not None:
+        asyncio.run(serve(args.host, args.server))
+        return
+    if args.simulate:
+        print_simulation(simulate(args.simulate, args.processes, args.seed))
+        return
+    game = SetGame(args.full_screen, args.attributes, args.open_cards)
     game.play_game()
 
 
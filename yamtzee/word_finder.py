@@ -0,0 +1,75 @@
+"""Finds the highest scoring word that can be made from the letter dice of a turn.
+
+The words are compiled once into NumPy arrays: the letters bitmask, the count of every letter(26 per word)
+and the score of every word. A query keeps the words without letters that are not on the dice(one bitmask
+operation over the whole dictionary), and checks the letter counts only for them.
+Letters of red dice can be used any number of times.
+"""
+
+import numpy as np
+
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+UNLIMITED = 255  # The count of a letter that can be used any number of times.
+
+
+class WordFinder:
+    """An index of the words of the dictionary by their letters.
+
+    Args:
+        words (iterable): The words, only words of English letters with at least 2 letters are kept(in lower case).
+        letter_points (list): The points of each letter, from "a" to "z".
+
+    Attributes:
+        words (numpy.ndarray): The words.
+        masks (numpy.ndarray): Bit i is set if letter i("a" is 0) is in the word.
+        counts (numpy.ndarray): The count of every letter in every word(words x 26).
+        scores (numpy.ndarray): The score of every word.
+    """
+    def __init__(self, words, letter_points):
+        words = sorted({word.lower() for word in words if len(word) >= 2 and word.isascii() and word.isalpha()})
+        self.words = np.array(words, dtype=object)
+        lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        codes = np.frombuffer("".join(words).encode(), dtype=np.uint8).astype(np.int64) - ord("a")
+        rows = np.repeat(np.arange(len(words)), lengths)
+        self.counts = np.bincount(rows * len(LETTERS) + codes, minlength=len(words) * len(LETTERS)
+                                  ).reshape(len(words), len(LETTERS)).astype(np.uint8)
+        self.masks = (self.counts > 0).astype(np.uint32) @ (np.uint32(1) << np.arange(len(LETTERS), dtype=np.uint32))
+        self.scores = self.counts.astype(np.int64) @ np.asarray(letter_points, dtype=np.int64)
+
+    def matches(self, letters, unlimited_letters=()):
+        """Return the indexes of the words that can be made from the letters.
+
+        Args:
+            letters (iterable): The letters that can be used once each(a letter may appear more than once).
+            unlimited_letters (iterable, optional): The letters that can be used any number of times.
+
+        Returns:
+            numpy.ndarray: The indexes of the words in `words`.
+        """
+        available = np.zeros(len(LETTERS), dtype=np.uint8)
+        for letter in letters:
+            available[LETTERS.index(letter.lower())] += 1
+        for letter in unlimited_letters:
+            available[LETTERS.index(letter.lower())] = UNLIMITED
+        mask = 0
+        for position in np.flatnonzero(available):
+            mask |= 1 << int(position)
+        candidates = np.flatnonzero((self.masks & np.uint32(~mask & 0xFFFFFFFF)) == 0)
+        return candidates[(self.counts[candidates] <= available).all(axis=1)]
+
+    def best_word(self, letters, unlimited_letters=()):
+        """Return the highest scoring word that can be made from the letters(the first in alphabetical order if equal).
+
+        Args:
+            letters (iterable): The letters that can be used once each.
+            unlimited_letters (iterable, optional): The letters that can be used any number of times.
+
+        Returns:
+            tuple: (word, score), or `None` if no word can be made.
+        """
+        candidates = self.matches(letters, unlimited_letters)
+        if len(candidates) == 0:
+            return None
+        best = candidates[np.argmax(self.scores[candidates])]
+        return self.words[best], int(self.scores[best])
@@ -1,12 +1,207 @@
+import argparse
+from array import array
+from bisect import bisect
+from collections import Counter
+from functools import lru_cache
+import hashlib
+from itertools import accumulate
 import math
+import mmap
+from multiprocessing import Pool
+import os
 import random
 import string
+import struct
 
 import requests
 
 
 ALL_WORD_PAGE = "https://raw.githubusercontent.com/dwyl/english-words/master/words.txt"
 ALL_WORD_FILE = r"all_words.txt"
+# The compiled dictionary, mapped to memory at startup(shared by all the games and processes on the host):
+# header, the offset of every word and one after the last(uint32), then the sorted lower case words.
+DICTIONARY_FILE = r"all_words.bin"
+DICTIONARY_MAGIC = b"YMTZ"
+DICTIONARY_VERSION = 2
+# magic, version, number of words, size of the offsets and words, sha256 of the offsets and words
+DICTIONARY_HEADER = struct.Struct("<4sIIQ32s")
+DOWNLOAD_TIMEOUT = 10  # seconds
+MAX_SIMULATION_TURNS = 1000  # A simulated game that did not reach the top score by then is stopped.
+
+
+def write_dictionary(words, path=DICTIONARY_FILE):
+    """Compile the words into the dictionary file(written to a temporary file and replaced at once).
+
+    Args:
+        words (iterable): The words, kept in lower case.
+        path (str, optional): The dictionary file.
+
+    Returns:
+        int: The number of words.
+    """
+    words = sorted({word.lower().encode() for word in words})
+    offsets = array("I", accumulate(map(len, words), initial=0))
+    data = offsets.tobytes() + b"".join(words)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(DICTIONARY_HEADER.pack(DICTIONARY_MAGIC, DICTIONARY_VERSION, len(words), len(data),
+                                          hashlib.sha256(data).digest()))
+        file.write(data)
+    os.replace(temp_path, path)
+    load_dictionary.cache_clear()
+    return len(words)
+
+
+class PackedWords:
+    """A read only set of lower case words, in a dictionary file mapped to memory.
+    A word is found by binary search, so nothing is loaded but the pages that are read,
+    and the pages are shared by all the processes that map the file.
+
+    Args:
+        path (str): The dictionary file.
+
+    Attributes:
+        path (str): The dictionary file.
+        _map (mmap.mmap): The dictionary file in memory.
+        _start (int): The position of the words in `_map`.
+        _offsets (memoryview): The offset of every word from `_start` and one after the last.
+        _scores (dict): The score of every word for each table of points - dict:(points: array).
+
+    Raises:
+        FileNotFoundError: If there is no dictionary file.
+        ValueError: If the file is not a dictionary of this version or its checksum does not match.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < DICTIONARY_HEADER.size:
+                raise ValueError(f"{path} is not a dictionary file.")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, size, checksum = DICTIONARY_HEADER.unpack_from(self._map)
+        if magic != DICTIONARY_MAGIC or version != DICTIONARY_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a dictionary file of version {DICTIONARY_VERSION}.")
+        data = memoryview(self._map)[DICTIONARY_HEADER.size:]
+        offsets_size = (count + 1) * array("I").itemsize
+        if len(data) != size or size < offsets_size or hashlib.sha256(data).digest() != checksum:
+            data.release()
+            self._map.close()
+            raise ValueError(f"{path} is corrupted.")
+        self._start = DICTIONARY_HEADER.size + offsets_size
+        self._offsets = data[:offsets_size].cast("I")
+        self._scores = {}
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        """Return the word at `index`(in alphabetical order)."""
+        return self._map[self._start + self._offsets[index]:self._start + self._offsets[index + 1]].decode()
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __contains__(self, word):
+        return self.index(word) >= 0
+
+    def index(self, word):
+        """Return the index of a word(in any case), or -1 if it is not in the dictionary."""
+        key = word.lower().encode()
+        offsets = self._offsets
+        words = self._map
+        start = self._start
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            value = words[start + offsets[middle]:start + offsets[middle + 1]]
+            if value < key:
+                low = middle + 1
+            elif value > key:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def scores(self, points):
+        """Return the score of every word(computed once for each table of points, for all the games of the process).
+
+        Args:
+            points (tuple): The points of each letter, from "a" to "z".
+
+        Returns:
+            array: The score of every word, in the order of the words.
+        """
+        if points not in self._scores:
+            table = bytearray(256)  # The points of every byte, 0 for a byte that is not a letter
+            for letter, letter_points in zip(string.ascii_lowercase, points):
+                table[ord(letter)] = letter_points
+            values = self._map[self._start:self._start + self._offsets[len(self)]].translate(table)
+            offsets = self._offsets
+            self._scores[points] = array("H", (sum(values[offsets[index]:offsets[index + 1]])
+                                               for index in range(len(self))))
+        return self._scores[points]
+
+
+@lru_cache(maxsize=None)
+def load_dictionary(path=DICTIONARY_FILE):
+    """Return the words of the dictionary file(the same `PackedWords` for all the games of the process).
+
+    Args:
+        path (str, optional): The dictionary file.
+
+    Returns:
+        PackedWords: The words.
+
+    Raises:
+        FileNotFoundError: If there is no dictionary file.
+        ValueError: If the file is not a dictionary of this version or its checksum does not match.
+    """
+    return PackedWords(path)
+
+
+def refresh_dictionary(path=DICTIONARY_FILE, timeout=DOWNLOAD_TIMEOUT):
+    """Download the words from github and compile them into the dictionary file.
+
+    Args:
+        path (str, optional): The dictionary file.
+        timeout (float, optional): Seconds to wait for the server.
+
+    Returns:
+        int: The number of words.
+
+    Raises:
+        requests.exceptions.RequestException: If the download failed.
+    """
+    r = requests.get(ALL_WORD_PAGE, timeout=timeout)
+    r.raise_for_status()
+    return write_dictionary(r.text.split(), path)
+
+
+@lru_cache(maxsize=None)
+def cumulative_weights(weights):
+    """Return the cumulative weights of the values(shared by all the cubes with the same weights).
+
+    Args:
+        weights (tuple): The numbers that represent the rolling possibility for each value.
+
+    Returns:
+        tuple: The cumulative weights, for `random.choices(values, cum_weights=...)`.
+    """
+    return tuple(accumulate(weights))
+
+
+@lru_cache(maxsize=None)
+def letter_points(weights):
+    """Return the points of each letter: 12 divided by the square root of its rounded up frequency ** 1.5, rounded down.
+
+    Args:
+        weights (tuple): The rolling possibility of each letter, from "a" to "z".
+
+    Returns:
+        tuple: The points of each letter, from "a" to "z".
+    """
+    return tuple(math.floor(12 / math.sqrt(math.ceil(weight) ** 1.5)) for weight in weights)
 
 
 class Dice:
@@ -23,6 +218,8 @@ class Dice:
         _value (str): The current value selected by the roll is initialized as `None`.
         _values (list): The values that appear on the sides.
     """
+    __slots__ = ("_color", "_sides", "_value", "_values")
+
     def __init__(self, color, sides, values):
         self._color = self._set_color(color)
         if self._check_sides_and_values(sides, values):
@@ -90,10 +287,14 @@ class UnbalancedDice(Dice):
         _value (str): The current value selected by the roll is initialized as `None`.
         _values (list): The values that appear on the sides.
         _weights (list): The numbers that represent the rolling possibility for each value of the cube.
+        _cum_weights (tuple): The cumulative weights, computed once for all the cubes with the same weights.
     """
+    __slots__ = ("_weights", "_cum_weights")
+
     def __init__(self, color, sides, values, weights):
         super().__init__(color, sides, values)
         self._weights = self._set_weights(weights, sides)
+        self._cum_weights = cumulative_weights(tuple(self._weights))
 
     def _set_weights(self, weights, sides):
         """Return the weights of each side of the cube.
@@ -122,7 +323,7 @@ class UnbalancedDice(Dice):
 
     def roll(self):
         """Rolls the dice and set its value randomly with a different possibility for each value."""
-        self._value = random.choices(self._values, self._weights)[0]
+        self._value = self._values[bisect(self._cum_weights, random.random() * self._cum_weights[-1])]
         return self
 
 
@@ -140,122 +341,273 @@ class NumericalDice(Dice):
         _value (str): The current value selected by the roll is initialized as `None`.
         _values (list): The values that appear on the sides.
     """
+    __slots__ = ()
+
     def __init__(self, color, sides):
         values = list(range(1, sides + 1))
         super().__init__(color, sides, values)
 
 
+class DicePool:
+    """A 'large bag' of cubes that differ only in color.
+    The faces and weights are shared by all the cubes and the colors are kept in a byte array.
+    A roll draws the value and the color directly, a cube object is created only when it is needed.
+
+    Args:
+        prototype (Dice): A cube with the faces(and weights) of all the cubes.
+        color_names (list): The colors of cubes.
+        colors (bytearray): The color of each cube, an index in `color_names`.
+
+    Attributes:
+        prototype (Dice): A cube with the faces(and weights) of all the cubes.
+        color_names (list): The colors of cubes.
+        colors (bytearray): The color of each cube, an index in `color_names`.
+        _cum_weights (tuple): The cumulative weights of the faces.
+        _shared (list): (name, value) of the attributes that every cube object shares with the prototype.
+    """
+    __slots__ = ("prototype", "color_names", "colors", "_cum_weights", "_shared")
+
+    def __init__(self, prototype, color_names, colors):
+        self.prototype = prototype
+        self.color_names = color_names
+        self.colors = colors
+        if isinstance(prototype, UnbalancedDice):
+            self._cum_weights = prototype._cum_weights
+        else:
+            self._cum_weights = tuple(range(1, prototype._sides + 1))
+        self._shared = [(name, getattr(prototype, name)) for cls in type(prototype).__mro__
+                        for name in getattr(cls, "__slots__", ()) if name not in ("_color", "_value")]
+
+    def __len__(self):
+        return len(self.colors)
+
+    def __getitem__(self, index):
+        """Return a new cube object of the cube at `index`(not rolled)."""
+        return self.cube(None, self.color_names[self.colors[index]])
+
+    def cube(self, value, color):
+        """Return a cube object with the value and the color(the faces and weights are shared with the prototype).
+
+        Args:
+            value (str or int): The value of the cube.
+            color (str): The color of the cube.
+
+        Returns:
+            Dice: The cube, of the class of the prototype.
+        """
+        dice = object.__new__(type(self.prototype))
+        for name, shared in self._shared:
+            setattr(dice, name, shared)
+        dice._color = color
+        dice._value = value
+        return dice
+
+    def roll_value(self):
+        """Return the value of a roll of a cube of the bag."""
+        return self.prototype._values[bisect(self._cum_weights, random.random() * self._cum_weights[-1])]
+
+    def roll_color(self):
+        """Return the color of a random cube of the bag."""
+        return self.color_names[self.colors[math.floor(random.random() * len(self.colors))]]
+
+    def roll(self):
+        """Takes a random cube out of the bag(with return) and returns it rolled."""
+        return self.cube(self.roll_value(), self.roll_color())
+
+    def roll_many(self, n):
+        """Takes `n` random cubes out of the bag(with return) and rolls them.
+
+        Args:
+            n (int): The number of cubes.
+
+        Returns:
+            tuple: (values, colors) - the rolled values and the colors of the cubes(lists).
+        """
+        return [self.roll_value() for _ in range(n)], [self.roll_color() for _ in range(n)]
+
+
 class Yamtzee:
     """The "Yamtzee" game.
     
     Args:
         num_of_player (int): The num of player.
         top_score (int): The top score - whoever reaches the score wins.
+        num_of_ai (int, optional): The num of computer players, after the other players.
 
     Attributes:
         dice (int): The number of dice for each type of dice.
         COLORS (list): The colors of dice.
         COLORS_WEIGHTS (list): The numbers that represent the rolling possibility for each color.
+        AI_ROLL_AGAIN_LENGTH (int): A computer player rolls again a green length cube up to this number.
         LETTERS (list): All ascii letters in the Alphabet.
         LETTERS_WEIGHTS (list): The numbers that represent the rolling possibility for each letter.
                                 From: https://en.wikipedia.org/wiki/Letter_frequency.
         _num_of_player (int): The num of player.
         _top_score (int): The top score - whoever reaches the score wins.
         _players_score (dict): The score of each player - dict:(player: score).
-        length_dice (list): A lot of cubes -> `Numerical dice`.
-        letter_dice (list): A lot of cubes -> `Unbalanced dice`.
-        all_words (set): All correct words in English.
+        _ai_players (set): The computer players.
+        length_dice (DicePool): A lot of cubes -> `Numerical dice`.
+        letter_dice (DicePool): A lot of cubes -> `Unbalanced dice`.
+        all_words (PackedWords): All correct words in English(in lower case).
+        letter_points (dict): The points of each letter - dict:(letter: points).
+        _word_finder (WordFinder): The index of `all_words` for hints and computer players, built on first use.
     """
     dice = 500
     COLORS = ["Red", "Green", "Blue"]
     COLORS_WEIGHTS = [10, 25, 65]
+    AI_ROLL_AGAIN_LENGTH = 4
     LETTERS = list(string.ascii_lowercase)
     LETTERS_WEIGHTS = [8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 
                        6.094, 6.966, 0.253, 1.772, 4.025, 2.406, 6.749, 
                        7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 
                        0.978, 2.360, 0.250, 1.974, 0.074]
 
-    def __init__(self, num_of_player, top_score):
+    def __init__(self, num_of_player, top_score, num_of_ai=0):
         self._num_of_player = num_of_player
         self._top_score = top_score
-        self._players_score = {str(player): 0 for player in range(1, num_of_player + 1)}
+        self._players_score = {str(player): 0 for player in range(1, num_of_player + num_of_ai + 1)}
+        self._ai_players = {str(player) for player in range(num_of_player + 1, num_of_player + num_of_ai + 1)}
         self.length_dice = self._get_length_dice()
         self.letter_dice = self._get_letter_dice()
         self.all_words = self._get_all_words()
+        self.letter_points = self._get_letter_points()
+        self._word_finder = None
 
-    def _get_color(self):
-        """Return random color."""
-        return random.choices(self.COLORS, self.COLORS_WEIGHTS)[0]
+    def _get_colors(self):
+        """Return random colors for all the cubes of a bag, as indexes in `COLORS`."""
+        return bytearray(random.choices(range(len(self.COLORS)), self.COLORS_WEIGHTS, k=self.dice))
 
     def _get_length_dice(self):
-        """Returns a list filled with random `NumericalDice` cubes."""
-        return [NumericalDice(self._get_color(), 10) for _ in range(self.dice)]
+        """Returns a bag of random `NumericalDice` cubes."""
+        return DicePool(NumericalDice(self.COLORS[0], 10), self.COLORS, self._get_colors())
 
     def _get_letter_dice(self):
-        """Returns a list filled with random `UnbalancedDice` cubes."""
-        return [UnbalancedDice(self._get_color(), 26, self.LETTERS, self.LETTERS_WEIGHTS) for _ in range(self.dice)]
+        """Returns a bag of random `UnbalancedDice` cubes."""
+        return DicePool(UnbalancedDice(self.COLORS[0], 26, self.LETTERS, self.LETTERS_WEIGHTS), self.COLORS,
+                        self._get_colors())
 
     def _get_all_words(self):
-        """Return all words in english(from github or file)."""
+        """Return all words in english(from the dictionary file, compiled from `ALL_WORD_FILE` if missing).
+
+        The network is never used here, the dictionary is downloaded only by `refresh_dictionary`.
+
+        Raises:
+            FileNotFoundError: If there is no dictionary file and no words file.
+        """
         try:
-            r = requests.get(ALL_WORD_PAGE)
-        except requests.exceptions.RequestException:
-            file = open(ALL_WORD_FILE, "r")
-            all_word = file.read()
-            file.close()
-        else:
-            all_word = r.text
-        finally:
-            all_word = set(all_word.split())
-        return all_word
+            return load_dictionary(DICTIONARY_FILE)
+        except (FileNotFoundError, ValueError):
+            pass
+        try:
+            with open(ALL_WORD_FILE, "r") as file:
+                write_dictionary(file.read().split(), DICTIONARY_FILE)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No dictionary, run with --refresh-words to download it "
+                                    f"or put the words in {ALL_WORD_FILE}.") from None
+        return load_dictionary(DICTIONARY_FILE)
+
+    def _get_letter_points(self):
+        """Return the points of each letter(according to the frequency of the letter in the English language)."""
+        return dict(zip(self.LETTERS, letter_points(tuple(self.LETTERS_WEIGHTS))))
+
+    def word_score(self, word):
+        """Return the score of a word, the sum of the points of its letters."""
+        return sum(self.letter_points.get(letter, 0) for letter in word.lower())
+
+    def word_scores(self):
+        """Return the score of every word of `all_words`, in the order of the words(for leaderboards and simulations).
+
+        Returns:
+            array: The scores, computed once for all the games of the process with the same points.
+        """
+        return self.all_words.scores(tuple(self.letter_points[letter] for letter in self.LETTERS))
+
+    def max_score(self, letters):
+        """Return the maximum score that can be achieved with the letter cubes of a roll(0 if no word can be made)."""
+        best = self.find_best_word(letters)
+        return best[1] if best else 0
 
     def _add_score(self, player, word):
         """Adds a score to the player. 
         (according to a certain algorithm according to the frequency of the letter in the English language).
         """
-        score = 0
-        for letter in word:
-            frequency = math.ceil(self.LETTERS_WEIGHTS[self.LETTERS.index(letter)])
-            score += math.floor(12 / (math.sqrt(frequency ** 1.5)))
+        score = self.word_score(word)
         self._players_score[player] += score
         print(f"{score} points added to player - {player}")
+        return score
+
+    def _roll_length(self):
+        """Return (value, color) of a roll of a length cube, if 1 selected roll again."""
+        value = self.length_dice.roll_value()
+        while value == 1:
+            value = self.length_dice.roll_value()
+        return value, self.length_dice.roll_color()
+
+    def _roll_letters(self, length, length_color):
+        """Return (values, colors) of the letter cubes of a length cube, if `Red` adds another letter cube."""
+        if length_color == self.COLORS[0]:
+            length += 1
+        return self.letter_dice.roll_many(length)
 
     def _roll_length_dice(self):
         """Return `length dice` instance and rolls the dice, if 1 selected roll again."""
-        dice = random.choice(self.length_dice)
-        dice.roll()
-        while dice._value == 1:
-            dice = random.choice(self.length_dice)
-            dice.roll()
-        return dice
+        return self.length_dice.cube(*self._roll_length())
 
     def _roll_letter_dice(self):
         """Return `letter dice` instance and rolls the dice."""
-        dice = random.choice(self.letter_dice)
-        dice.roll()
-        return dice
+        return self.letter_dice.roll()
 
     def get_letter_dice(self, current_length_dice):
         """Return number of letter cubes according to the number given in the length cube, if `Red` adds another letter cube."""
-        num_of_letter_dice_to_create = current_length_dice._value
-        if current_length_dice._color == self.COLORS[0]:
-            num_of_letter_dice_to_create += 1
-        letter_dice = [self._roll_letter_dice() for _ in range(num_of_letter_dice_to_create)]
-        return letter_dice
+        values, colors = self._roll_letters(current_length_dice._value, current_length_dice._color)
+        return [self.letter_dice.cube(value, color) for value, color in zip(values, colors)]
 
     def check_input_from_player(self, word, letters):
+        letters = list(letters)  # The cubes that were not used yet
         letters_values = [letter._value for letter in letters]
         if len(word) < 2:
             return False
         for letter in word.lower():
             if letter not in letters_values:
                 return False
-            elif letters[letters_values.index(letter)]._color != self.COLORS[0]:
-                letters_values.remove(letter)
-        if word in self.all_words or word.lower() in self.all_words:
-            return True
+            index = letters_values.index(letter)
+            if letters[index]._color != self.COLORS[0]:
+                del letters_values[index]
+                del letters[index]
+        return word in self.all_words
+
+    @property
+    def word_finder(self):
+        """The index of `all_words` by letters(needs numpy, built on first use)."""
+        if self._word_finder is None:
+            from word_finder import WordFinder
+            self._word_finder = WordFinder(self.all_words, [self.letter_points[letter] for letter in self.LETTERS])
+        return self._word_finder
+
+    def find_best_word(self, letters):
+        """Return the highest scoring word that can be made from the letter cubes(`Red` cubes can be used many times).
+
+        Args:
+            letters (list): The letter cubes.
+
+        Returns:
+            tuple: (word, score), or `None` if no word can be made.
+        """
+        return self._best_word([dice._value for dice in letters], [dice._color for dice in letters])
+
+    def _best_word(self, values, colors):
+        """Return the highest scoring word of the values and colors of the letter cubes, see `find_best_word`."""
+        return self.word_finder.best_word(
+            [value for value, color in zip(values, colors) if color != self.COLORS[0]],
+            {value for value, color in zip(values, colors) if color == self.COLORS[0]})
+
+    def print_hint(self, letters):
+        """Print the highest scoring word of the letter cubes."""
+        best = self.find_best_word(letters)
+        if best is None:
+            print("Hint: no word can be made from these letters.")
         else:
-            return False
+            print(f"Hint: {best[0]} - {best[1]} points")
 
     def print_dice(self, player, current_length_dice, current_letter_dice):
         print(f"\nPlayer: {player}\nPoints: {self._players_score[player]}\n")
@@ -265,6 +617,49 @@ class Yamtzee:
         print("\n")
         return None
 
+    def roll_again(self, current_length_dice, current_letter_dice, dice):
+        """Roll again a cube of the turn, for the length cube the letter cubes are replaced by new ones.
+
+        Args:
+            current_length_dice (NumericalDice): The length cube of the turn.
+            current_letter_dice (list): The letter cubes of the turn.
+            dice (Dice): The cube to roll again.
+
+        Returns:
+            tuple: (current_length_dice, current_letter_dice).
+        """
+        dice.roll()
+        if dice is current_length_dice:
+            current_letter_dice = self.get_letter_dice(current_length_dice)
+        return current_length_dice, current_letter_dice
+
+    def ai_roll_again_options(self, length, letters):
+        """Roll again the green cubes of a computer player: a short length cube,
+        and then the letter cubes whose letter is not in the highest scoring word.
+        The cubes are rolled as values and colors, without cube objects.
+
+        Args:
+            length (tuple): (value, color) of the length cube.
+            letters (tuple): (values, colors) of the letter cubes.
+
+        Returns:
+            tuple: (length, letters, roll_again_counter).
+        """
+        roll_again_counter = 0
+        length_value, length_color = length
+        if length_color == self.COLORS[1] and length_value <= self.AI_ROLL_AGAIN_LENGTH:
+            length_value = self.length_dice.roll_value()
+            letters = self._roll_letters(length_value, length_color)
+            roll_again_counter += 1
+        values, colors = letters
+        best = self._best_word(values, colors)
+        used = set(best[0]) if best else set()
+        for position, color in enumerate(colors):
+            if color == self.COLORS[1] and values[position] not in used:
+                values[position] = self.letter_dice.roll_value()
+                roll_again_counter += 1
+        return (length_value, length_color), (values, colors), roll_again_counter
+
     def roll_again_options(self, player, current_length_dice, current_letter_dice):
         """Roll the dice again if their color is green."""
         roll_again_counter = 0
@@ -287,9 +682,9 @@ class Yamtzee:
             for dice in dice_to_roll_again.split(","):
                 if dice.strip().isdigit() and int(dice.strip()) <= len(dice_to_change):
                     if dice_to_change[int(dice.strip()) - 1] == current_length_dice:
-                        current_length_dice.roll()
+                        current_length_dice, current_letter_dice = self.roll_again(
+                            current_length_dice, current_letter_dice, current_length_dice)
                         roll_again_counter += 1
-                        current_letter_dice = self.get_letter_dice(current_length_dice)
                         self.print_dice(player, current_length_dice, current_letter_dice)
                         dice_to_change = []
                         dice_to_remove = []
@@ -298,24 +693,73 @@ class Yamtzee:
                                 dice_to_change.append(dice)
                         break
                     else:
-                        current_letter_dice[current_letter_dice.index(dice_to_change[int(dice.strip()) - 1])].roll()
+                        dice_to_roll = dice_to_change[int(dice.strip()) - 1]
+                        self.roll_again(current_length_dice, current_letter_dice, dice_to_roll)
                         roll_again_counter += 1
-                        dice_to_remove.append(current_letter_dice[current_letter_dice.index(dice_to_change[int(dice.strip()) - 1])])
+                        dice_to_remove.append(dice_to_roll)
             for dice in dice_to_remove:
                 dice_to_change.remove(dice)
+            dice_to_remove = []
         if roll_again_counter != 0:
             self.print_dice(player, current_length_dice, current_letter_dice)
         return current_length_dice, current_letter_dice
 
+    def _play_ai_turn(self, player, show_dice=None):
+        """Make a turn of a computer player without printing, it plays the highest scoring word.
+
+        Args:
+            player (str): The computer player.
+            show_dice (callable, optional): Called with (value, color) of the length cube and (values, colors)
+                of the letter cubes after they are rolled, and again if cubes are rolled again.
+
+        Returns:
+            tuple: (word, score), the word is `None` and the score 0 if no word can be made.
+        """
+        length = self._roll_length()
+        letters = self._roll_letters(*length)
+        if show_dice:
+            show_dice(length, letters)
+        length, letters, roll_again_counter = self.ai_roll_again_options(length, letters)
+        if show_dice and roll_again_counter != 0:
+            show_dice(length, letters)
+        best = self._best_word(*letters)
+        if best is None:
+            return None, 0
+        self._players_score[player] += best[1]
+        return best
+
+    def ai_turn(self, player):
+        """Make a turn of a computer player, it plays the highest scoring word.
+
+        Returns:
+            int: The score of the turn.
+        """
+        def show_dice(length, letters):
+            self.print_dice(player, self.length_dice.cube(*length),
+                            [self.letter_dice.cube(value, color) for value, color in zip(*letters)])
+
+        word, score = self._play_ai_turn(player, show_dice)
+        if word is None:
+            print("No word.")
+            return 0
+        print(f"Word: {word}")
+        print(f"{score} points added to player - {player}")
+        return score
+
     def turn(self, player):
         """Make a turn."""
+        if player in self._ai_players:
+            return self.ai_turn(player)
         current_length_dice = self._roll_length_dice()
         current_letter_dice = self.get_letter_dice(current_length_dice)
         self.print_dice(player, current_length_dice, current_letter_dice)
         
         current_length_dice, current_letter_dice = self.roll_again_options(player, current_length_dice, current_letter_dice)
         
-        player_guess = input("Enter word: ")
+        player_guess = input("Enter word(or ? for a hint): ")
+        while player_guess == "?":
+            self.print_hint(current_letter_dice)
+            player_guess = input("Enter word: ")
         if self.check_input_from_player(player_guess, current_letter_dice):
             print(f"Correct answer: {player_guess}")
             self._add_score(player, player_guess)
@@ -329,6 +773,7 @@ The player should use the letter cubes, that they have come out, to create a wor
 A red length cube, gives the player another cube as a gift.
 A red letter cube, allows the player to use a letter that appears on the cube several times he wants.
 Green cubes, give the player the opportunity to choose whether to re-roll.
+Enter ? instead of a word to get a hint.
 Enjoy.
               """)
         while True:
@@ -339,8 +784,161 @@ Enjoy.
                     return True
             
 
+# The game of a worker process of `simulate`, set by `_init_simulation`.
+_simulation_game = None
+
+
+def _init_simulation(top_score, colors_weights, letters_weights):
+    """Create the game of a worker process once(the dictionary and its index are loaded once).
+
+    Args:
+        top_score (int): The top score of the games.
+        colors_weights (list): The rolling possibility for each color, `None` for the game's.
+        letters_weights (list): The rolling possibility for each letter, `None` for the game's.
+    """
+    global _simulation_game
+    _simulation_game = Yamtzee(0, top_score, 1)
+    if colors_weights:
+        _simulation_game.COLORS_WEIGHTS = colors_weights
+    if letters_weights:
+        _simulation_game.LETTERS_WEIGHTS = letters_weights
+        _simulation_game.letter_points = _simulation_game._get_letter_points()
+    _simulation_game.word_finder
+
+
+def simulate_game(game, seed):
+    """Play a game of one computer player until it reaches the top score.
+    The bags of cubes are created again for every game, so a game depends only on its seed.
+
+    Args:
+        game (Yamtzee): A game with one computer player, "1".
+        seed (int): Seed of the random rolls.
+
+    Returns:
+        list: The score of every turn.
+    """
+    random.seed(seed)
+    game.length_dice = game._get_length_dice()
+    game.letter_dice = game._get_letter_dice()
+    game._players_score["1"] = 0
+    scores = []
+    while game._players_score["1"] < game._top_score and len(scores) < MAX_SIMULATION_TURNS:
+        scores.append(game._play_ai_turn("1")[1])
+    return scores
+
+
+def _simulate_games(seeds):
+    """Play games for all the given seeds and return their statistics (runs in a worker process).
+
+    Args:
+        seeds (range): Seed of each game.
+
+    Returns:
+        dict: Statistics of the games, see `simulate`.
+    """
+    stats = {
+        "games": 0,
+        "turns": 0,
+        "unfinished_games": 0,
+        "turn_scores": Counter(),
+        "turns_to_top_score": Counter(),
+    }
+    for seed in seeds:
+        scores = simulate_game(_simulation_game, seed)
+        stats["games"] += 1
+        stats["turns"] += len(scores)
+        stats["turn_scores"].update(scores)
+        if sum(scores) >= _simulation_game._top_score:
+            stats["turns_to_top_score"][len(scores)] += 1
+        else:
+            stats["unfinished_games"] += 1
+    return stats
+
+
+def simulate(games, processes=None, seed=0, chunk_size=100, top_score=20, colors_weights=None, letters_weights=None):
+    """Play many headless games of a computer player in a process pool and aggregate their statistics.
+
+    Args:
+        games (int): The number of games to play.
+        processes (int, optional): The number of worker processes(default is the number of CPUs).
+        seed (int, optional): Seed of the first game, game number `n` uses `seed + n`.
+        chunk_size (int, optional): The number of games sent to a worker at once.
+        top_score (int, optional): The score that ends a game.
+        colors_weights (list, optional): The rolling possibility for each color, instead of `Yamtzee.COLORS_WEIGHTS`.
+        letters_weights (list, optional): The rolling possibility for each letter, instead of `Yamtzee.LETTERS_WEIGHTS`.
+
+    Returns:
+        dict: `games`, `turns`, `unfinished_games`, `mean_score`(per turn), `expected_turns`(to reach the top score)
+        and the counters `turn_scores` and `turns_to_top_score`.
+    """
+    chunks = [range(start, min(start + chunk_size, seed + games)) for start in range(seed, seed + games, chunk_size)]
+    with Pool(processes, initializer=_init_simulation, initargs=(top_score, colors_weights, letters_weights)) as pool:
+        results = pool.imap_unordered(_simulate_games, chunks)
+        stats = next(results, None) or _simulate_games(range(0))
+        for chunk_stats in results:
+            for key, value in chunk_stats.items():
+                stats[key] += value
+    finished = sum(stats["turns_to_top_score"].values())
+    stats["mean_score"] = sum(score * count for score, count in stats["turn_scores"].items()) / (stats["turns"] or 1)
+    stats["expected_turns"] = sum(turns * count for turns, count in stats["turns_to_top_score"].items()) / (finished or 1)
+    return stats
+
+
+def print_simulation(stats):
+    """Print the statistics of `simulate`."""
+    turns = stats["turns"] or 1
+    games = stats["games"] or 1
+    print(f"Games: {stats['games']}")
+    print(f"Turns: {stats['turns']}")
+    print(f"Mean score per turn: {stats['mean_score']:.3f}")
+    print(f"No word turns: {stats['turn_scores'][0] / turns:.2%}")
+    print(f"Expected turns to top score: {stats['expected_turns']:.3f}")
+    if stats["unfinished_games"]:
+        print(f"Games that did not reach the top score in {MAX_SIMULATION_TURNS} turns: {stats['unfinished_games']}")
+    for title, key, total in (("Score", "turn_scores", turns), ("Turns", "turns_to_top_score", games)):
+        print(f"\n{title: <8}Count")
+        for value, count in sorted(stats[key].items()):
+            print(f"{value: <8}{count} ({count / total:.2%})")
+
+
+def _weights(text):
+    """Return the weights of a command line argument(numbers with a comma between them)."""
+    return [float(weight) for weight in text.split(",")]
+
+
 def main():
-    yamtzee = Yamtzee(3, 20)
+    parser = argparse.ArgumentParser(description="Play Yamtzee.")
+    parser.add_argument("--ai", type=int, default=0, help="number of computer players(needs numpy)")
+    parser.add_argument("--top-score", type=int, default=20, help="whoever reaches the score wins")
+    parser.add_argument("--simulate", type=int, metavar="GAMES",
+                        help="play GAMES headless games of a computer player and print statistics")
+    parser.add_argument("--processes", type=int, help="number of worker processes for --simulate")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first simulated game")
+    parser.add_argument("--colors-weights", type=_weights, help="weights of red,green,blue for --simulate")
+    parser.add_argument("--letters-weights", type=_weights, help="26 weights of the letters for --simulate")
+    parser.add_argument("--refresh-words", action="store_true",
+                        help=f"download the words and compile {DICTIONARY_FILE} before playing")
+    args = parser.parse_args()
+    # Bad weights fail in the initializer of every worker process, check them before the pool starts.
+    for option, weights, count in (("--colors-weights", args.colors_weights, len(Yamtzee.COLORS)),
+                                   ("--letters-weights", args.letters_weights, len(Yamtzee.LETTERS))):
+        if weights is not None and len(weights) != count:
+            parser.error(f"argument {option}: expected {count} weights, got {len(weights)}")
+        if weights is not None and not all(0 < weight < math.inf for weight in weights):
+            parser.error(f"argument {option}: the weights must be positive numbers")
+    if args.refresh_words or not os.path.exists(DICTIONARY_FILE) and not os.path.exists(ALL_WORD_FILE):
+        # The first run downloads the words once, later runs only read the dictionary file.
+        try:
+            print(f"{refresh_dictionary()} words saved to {DICTIONARY_FILE}")
+        except requests.exceptions.RequestException as error:
+            print(f"Could not download the words ({error}).\n"
+                  f"Run again with --refresh-words, or put the words in {ALL_WORD_FILE}.")
+            return
+    if args.simulate:
+        print_simulation(simulate(args.simulate, args.processes, args.seed, top_score=args.top_score,
+                                  colors_weights=args.colors_weights, letters_weights=args.letters_weights))
+        return
+    yamtzee = Yamtzee(3, args.top_score, args.ai)
     yamtzee.play()
 
 